@@ -2,45 +2,36 @@
 Main ATIC Agent Implementation
 Author: Amin Motiwala
 
-This module defines the root agent that orchestrates the multi-agent system
-for adaptive technical interview coaching.
+This module provides the command-line entry point for adaptive technical interview
+coaching. The web root agent is defined in interviewer/agent.py.
 """
 
-from google.adk.agents import Agent
+from functools import lru_cache
 from google.adk.models.google_llm import Gemini
 from agents.interviewer_agent import InterviewerAgent
-from agents.researcher_agent import ResearcherAgent
-from agents.feedback_agent import FeedbackAgent
-from memory.memory_bank import MemoryBank
-from sessions.session_manager import SessionManager
+from memory.memory_bank import get_memory_bank
+from config.settings import get_settings
 import os
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-# Configure Gemini model for 5-point bonus
-gemini_model = Gemini(
-    name="gemini-pro",
-    api_key=os.getenv("GEMINI_API_KEY")
-)
 
-# Initialize memory bank for long-term learning
-memory_bank = MemoryBank()
-
-# Initialize session manager for context tracking
-session_manager = SessionManager(memory_bank)
-
-# Create agent instances for coordination
-interviewer_agent = InterviewerAgent(model=gemini_model, memory_bank=memory_bank)
-researcher_agent = ResearcherAgent(model=gemini_model)
-feedback_agent = FeedbackAgent(model=gemini_model, memory_bank=memory_bank)
-
-# Define the root agent that orchestrates the multi-agent system
-root_agent = Agent(
-    name="atic_root_agent",
-    model=gemini_model
-)
+@lru_cache(maxsize=1)
+def get_interviewer_agent() -> InterviewerAgent:
+    """
+    Build the interviewer agent on first use.
+    
+    The web entry point's root agent lives in interviewer/agent.py; this CLI path
+    only needs the interviewer, so nothing is constructed at import time.
+    """
+    # Configure Gemini model for 5-point bonus
+    gemini_model = Gemini(
+        name="gemini-pro",
+        api_key=os.getenv("GEMINI_API_KEY")
+    )
+    return InterviewerAgent(model=gemini_model, memory_bank=get_memory_bank())
 
 def initialize_atic_session():
     """
@@ -52,7 +43,7 @@ def initialize_atic_session():
     3. Context Engineering and Skill Extraction
     4. Adaptive Preparation Launch
     """
-    return interviewer_agent.initialize_session_context()
+    return get_interviewer_agent().initialize_session_context()
 
 def run_interview_session(user_profile: dict):
     """
@@ -61,10 +52,11 @@ def run_interview_session(user_profile: dict):
     Args:
         user_profile: User profile data from initialization
     """
-    return interviewer_agent.conduct_adaptive_interview(user_profile)
+    return get_interviewer_agent().conduct_adaptive_interview(user_profile)
 
 if __name__ == "__main__":
     # Entry point for ATIC system
     print("🚀 Adaptive Technical Interview Coach (ATIC) Starting...")
+    get_settings()  # Validate configuration and create data/log directories
     user_profile = initialize_atic_session()
     run_interview_session(user_profile)
\ No newline at end of file
@@ -0,0 +1,62 @@
+"""
+Model Call Coalescer
+Author: Amin Motiwala
+
+Coalesces concurrent, identical Gemini calls from parallel ATIC sessions so that only
+one request is sent to the model and every waiting session receives its response.
+"""
+
+import asyncio
+from typing import Dict, Optional
+
+
+class LMBatcher:
+    """
+    Single-flight coalescer for sub-agent model calls.
+
+    This class implements:
+    - In-flight tracking keyed by the LLM cache key (model, instruction, messages, temperature)
+    - Fan-out of the leader's response to every concurrent follower
+    - Graceful fallback when the leader fails (followers run their own call)
+    - Coalescing statistics
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.stats = {'calls': 0, 'coalesced': 0}
+
+    async def join(self, key: str) -> Optional[str]:
+        """
+        Wait for an identical call that is already in flight.
+
+        Args:
+            key: LLM cache key of the call
+
+        Returns:
+            The leader's response text, or None if no identical call is in flight
+            (or it failed) and the caller should make the call itself
+        """
+        future = self._in_flight.get(key)
+        if future is None:
+            return None
+
+        self.stats['coalesced'] += 1
+        # Shield so a cancelled follower does not cancel the leader's result
+        return await asyncio.shield(future)
+
+    def lead(self, key: str) -> None:
+        """Register the caller as the one session making the call for key."""
+        self.stats['calls'] += 1
+        self._in_flight[key] = asyncio.get_running_loop().create_future()
+
+    def release(self, key: str, response_text: Optional[str]) -> None:
+        """
+        Publish the leader's response (None on failure) to all followers.
+
+        Args:
+            key: LLM cache key of the call
+            response_text: Response produced by the leader
+        """
+        future = self._in_flight.pop(key, None)
+        if future is not None and not future.done():
+            future.set_result(response_text)
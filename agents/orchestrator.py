@@ -0,0 +1,80 @@
+"""
+Sub-Agent Orchestrator
+Author: Amin Motiwala
+
+Persists the events HandoffCustomAgent streams to the user in background tasks, so
+Memory Bank writes never sit on the user-visible critical path.
+"""
+
+import asyncio
+import functools
+import logging
+from typing import Any, Dict, Optional, Set
+
+from memory.memory_bank import get_memory_bank
+
+
+log = logging.getLogger("atic.orchestrator")
+
+
+class LMOrchestrator:
+    """
+    Background event persistence for HandoffCustomAgent turns.
+
+    This class implements:
+    - Event writes in tasks owned by the orchestrator, not by the streaming generator
+    - Logging of failed writes
+    - Per-session wait_for_pending() so a turn can end once its events are stored
+    """
+
+    def __init__(self):
+        # Strong references keep pending writes from being garbage collected mid-flight
+        self._pending: Dict[str, Set[asyncio.Task]] = {}
+
+    def record(self, session_id: str, event) -> None:
+        """
+        Store an event on a worker thread (SQLite calls block) without waiting for it.
+
+        Args:
+            session_id: Session the event belongs to
+            event: Event as shown to the user (completion tokens already stripped)
+        """
+        event_data = self._event_record(event)
+        if not event_data['content_text']:
+            return
+
+        task = asyncio.create_task(asyncio.to_thread(
+            get_memory_bank().store_agent_event, session_id, event_data
+        ))
+        self._pending.setdefault(session_id, set()).add(task)
+        task.add_done_callback(functools.partial(self._write_done, session_id))
+
+    async def wait_for_pending(self, session_id: Optional[str] = None) -> None:
+        """Wait until the event writes started so far (for one session, or all) have finished."""
+        if session_id is not None:
+            tasks = set(self._pending.get(session_id, ()))
+        else:
+            tasks = set().union(*self._pending.values())
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _write_done(self, session_id: str, task: asyncio.Task) -> None:
+        """Drop a finished write and log it if it failed."""
+        pending = self._pending.get(session_id)
+        if pending is not None:
+            pending.discard(task)
+            if not pending:
+                del self._pending[session_id]
+        if not task.cancelled() and task.exception() is not None:
+            log.error("Failed to store agent event", exc_info=task.exception())
+
+    def _event_record(self, event) -> Dict[str, Any]:
+        """Extract the persisted fields of an event."""
+        parts = getattr(getattr(event, 'content', None), 'parts', None) or []
+        return {
+            'event_id': event.id,
+            'invocation_id': event.invocation_id,
+            'author': event.author,
+            'timestamp': event.timestamp,
+            'content_text': "".join(part.text for part in parts if getattr(part, 'text', None))
+        }
@@ -5,8 +5,10 @@ Author: Amin Motiwala
 Centralized configuration management for the Adaptive Technical Interview Coach.
 """
 
+import functools
 import os
 from pathlib import Path
+from types import MappingProxyType
 from typing import Dict, Any
 from dotenv import load_dotenv
 
@@ -63,37 +65,39 @@ class ATICSettings:
     
     # Memory Bank Configuration
     DATABASE_PATH = Path(__file__).parent.parent / "memory" / "data" / "atic_memory.db"
+    SQLITE_POOL_SIZE = 5  # Read-only connections; one per concurrent session
     BACKUP_INTERVAL_HOURS = 24
     DATA_RETENTION_DAYS = 365
     
     # Difficulty Levels
-    DIFFICULTY_LEVELS = {
-        "beginner": {
+    # Read-only so the shared settings can't be mutated by downstream code
+    DIFFICULTY_LEVELS = MappingProxyType({
+        "beginner": MappingProxyType({
             "complexity_score": 1,
             "time_multiplier": 1.5,
             "hint_availability": "high"
-        },
-        "intermediate": {
+        }),
+        "intermediate": MappingProxyType({
             "complexity_score": 2,
             "time_multiplier": 1.0,
             "hint_availability": "medium"
-        },
-        "advanced": {
+        }),
+        "advanced": MappingProxyType({
             "complexity_score": 3,
             "time_multiplier": 0.8,
             "hint_availability": "low"
-        }
-    }
+        })
+    })
     
     # Performance Scoring Configuration
-    SCORING_WEIGHTS = {
+    SCORING_WEIGHTS = MappingProxyType({
         "problem_solving": 0.25,
         "technical_knowledge": 0.20,
         "code_quality": 0.20,
         "communication": 0.15,
         "system_design": 0.15,
         "time_management": 0.05
-    }
+    })
     
     # Logging Configuration
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -170,11 +174,21 @@ class ATICSettings:
 # Create global settings instance
 settings = ATICSettings()
 
-# Validate configuration on import
-validation_result = settings.validate_configuration()
-if not validation_result["is_valid"]:
-    print("⚠️ Configuration validation failed. Please check your settings.")
-    for error in validation_result["errors"]:
-        print(f"❌ {error}")
-else:
-    print("✅ ATIC configuration validated successfully")
\ No newline at end of file
+
+@functools.lru_cache(maxsize=1)
+def get_settings() -> ATICSettings:
+    """
+    Return the shared settings, validating the configuration on first use.
+    
+    Environment variables are read once when the class body executes; the
+    validation side effects (directory creation, status output) run only the
+    first time settings are requested rather than on import.
+    """
+    validation_result = settings.validate_configuration()
+    if not validation_result["is_valid"]:
+        print("⚠️ Configuration validation failed. Please check your settings.")
+        for error in validation_result["errors"]:
+            print(f"❌ {error}")
+    else:
+        print("✅ ATIC configuration validated successfully")
+    return settings
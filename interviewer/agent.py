@@ -1,3 +1,5 @@
+import logging
+import re
 import sys
 import os
 from dotenv import load_dotenv
@@ -5,31 +7,150 @@ from google.adk.agents import Agent
 from google.adk.tools.agent_tool import AgentTool
 from google.adk.agents.sequential_agent import SequentialAgent
 from google.adk.agents.base_agent import BaseAgent
-from google.adk.events import Event
+from google.adk.events import Event, EventActions
 from google.adk.agents.invocation_context import InvocationContext
-from typing import Optional
+from google.genai import types
+from pydantic import ConfigDict, PrivateAttr
+from typing import Dict, Optional, Tuple
 
-# Import memory bank for data storage
-from memory.memory_bank import MemoryBank
+# Response caches (opened lazily on first sub-agent run)
+from memory.llm_cache import LLMCache, get_llm_cache
+from memory.semantic_cache import SemanticCache, get_semantic_cache
+from agents.batcher import LMBatcher
+from agents.orchestrator import LMOrchestrator
+from config.settings import get_settings
 
 # Load environment variables
 load_dotenv()
 
 print("✅ ATIC system initializing...")
 
-# Initialize memory bank for data storage
-memory_bank = MemoryBank()
+# Validate configuration and create data/log directories before any store opens
+get_settings()
+
+# Per-turn routing diagnostics; %s arguments are only formatted when DEBUG is enabled
+log = logging.getLogger("atic.handoff")
+log.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+# Shares one model call between concurrent sessions sending an identical prompt
+lm_batcher = LMBatcher()
+
+# Persists the events of each turn in background tasks
+lm_orchestrator = LMOrchestrator()
+
+# Completion tokens the sub-agents emit on their final line, and the session state flags they set.
+# Short and out-of-vocabulary so the model reproduces them verbatim and a suffix check finds them.
+PROFILE_COMPLETE_SIGNAL = '<<ATIC_PROFILE_DONE_v1>>'
+INTERVIEW_COMPLETE_SIGNAL = '<<ATIC_INTERVIEW_DONE_v1>>'
+PROFILE_COMPLETE_STATE_KEY = 'atic_profile_complete'
+INTERVIEW_COMPLETE_STATE_KEY = 'atic_interview_complete'
+
+
+def _event_text(event) -> str:
+    """Concatenate the text parts of an event's content."""
+    content = getattr(event, 'content', None)
+    parts = getattr(content, 'parts', None) or []
+    return "".join(part.text for part in parts if getattr(part, 'text', None))
+
+
+def _llm_cache_key(agent: BaseAgent, context: InvocationContext) -> Optional[str]:
+    """
+    Build the LLM cache key for the next call to agent, or None if not cacheable.
+
+    Caching is opt-in: only agents configured with generate_content_config temperature=0
+    make identical calls, so agents on default sampling always run the model.
+    """
+    config = getattr(agent, 'generate_content_config', None)
+    temperature = getattr(config, 'temperature', None)
+    if not LLMCache.is_cacheable(temperature):
+        return None
+
+    model = agent.model if isinstance(agent.model, str) else agent.model.model
+    messages = [[event.author, _event_text(event)] for event in context.session.events]
+    instruction = _INSTRUCTION_DIGESTS.get(agent.instruction) or LLMCache.instruction_digest(agent.instruction)
+    return LLMCache.cache_key(model, instruction, messages, temperature)
+
+
+def _semantic_scope(agent: BaseAgent, context: InvocationContext) -> str:
+    """Digest of what the agent sees besides the user turn: earlier messages and the state its instruction reads."""
+    messages = [
+        [event.author, _event_text(event)]
+        for event in context.session.events
+        if event.invocation_id != context.invocation_id
+    ]
+    state_keys = _INSTRUCTION_STATE_KEYS.get(agent.instruction)
+    if state_keys is None:
+        state_keys = _STATE_PLACEHOLDER_RE.findall(agent.instruction)
+    state = {key: context.session.state.get(key) for key in state_keys}
+    return SemanticCache.context_digest(messages, state)
+
+
+def _without_completion_signals(text: str) -> str:
+    """Response text with a trailing completion token removed."""
+    tail = text.rstrip()
+    for signal in (PROFILE_COMPLETE_SIGNAL, INTERVIEW_COMPLETE_SIGNAL):
+        if tail.endswith(signal):
+            return tail[:-len(signal)].rstrip()
+    return text
+
+
+def _user_turn_text(context: InvocationContext) -> str:
+    """Text of the user message that started this invocation."""
+    parts = getattr(context.user_content, 'parts', None) or []
+    return "".join(part.text for part in parts if getattr(part, 'text', None))
+
+
+def _record_completion(event: Event, author: str, signal: str, state_key: str) -> None:
+    """Flag completion in session state when author's final response ends with signal, and strip it."""
+    if event.author != author or not event.is_final_response():
+        return
+    parts = getattr(event.content, 'parts', None) or []
+    text_parts = [part for part in parts if getattr(part, 'text', None)]
+    if not text_parts:
+        return
+
+    # Only the tail of the response can carry the token
+    tail = text_parts[-1].text.rstrip()
+    if not tail.endswith(signal):
+        return
+
+    # The token is for the coordinator; users and later prompts see the message without it
+    text_parts[-1].text = tail[:-len(signal)].rstrip()
+    for key, value in event.actions.state_delta.items():
+        if isinstance(value, str) and value.rstrip().endswith(signal):
+            event.actions.state_delta[key] = value.rstrip()[:-len(signal)].rstrip()
+    event.actions.state_delta[state_key] = True
+
+
+def _cached_event(agent: BaseAgent, context: InvocationContext, text: str) -> Event:
+    """Replay a cached response as if agent had just produced it."""
+    actions = EventActions()
+    if getattr(agent, 'output_key', None):
+        actions.state_delta[agent.output_key] = text
+    return Event(
+        invocation_id=context.invocation_id,
+        author=agent.name,
+        branch=context.branch,
+        content=types.Content(role='model', parts=[types.Part(text=text)]),
+        actions=actions
+    )
+
 
 class HandoffCustomAgent(BaseAgent):
-    # 1. Declare fields as Optional to satisfy Pydantic's initial validation
-    session_agent: Optional[BaseAgent] = None
-    interviewer_agent: Optional[BaseAgent] = None
-    feedback_agent: Optional[BaseAgent] = None
+    # Sub-agents never change after construction; frozen makes that explicit
+    model_config = ConfigDict(frozen=True, arbitrary_types_allowed=True)
+
+    # 1. Declare fields as required; __init__ always supplies them
+    session_agent: BaseAgent
+    interviewer_agent: BaseAgent
+    feedback_agent: BaseAgent
     handoff_threshold: int = 4 # Provide a default value
+    # (profile complete, interview complete) -> (sub-agent, completion token, state key it sets)
+    _dispatch: Dict[Tuple[bool, bool], Tuple[BaseAgent, Optional[str], Optional[str]]] = PrivateAttr(default_factory=dict)
 
     # 2. Use the __init__ to receive required parameters and call super
     def __init__(self, session_agent: BaseAgent, interviewer_agent: BaseAgent, feedback_agent: BaseAgent, handoff_threshold: int = 3, **kwargs):
-        # Temporarily set the fields so Pydantic sees them during internal checks
+        # Pass the fields through kwargs so Pydantic validates them with the rest
         kwargs['session_agent'] = session_agent
         kwargs['interviewer_agent'] = interviewer_agent
         kwargs['feedback_agent'] = feedback_agent
@@ -45,107 +166,79 @@ class HandoffCustomAgent(BaseAgent):
         
         # At this point, the attributes are validated and assigned by super().__init__
         # You can now safely use self.session_agent etc.
+        profile_phase = (self.session_agent, PROFILE_COMPLETE_SIGNAL, PROFILE_COMPLETE_STATE_KEY)
+        self._dispatch = {
+            (False, False): profile_phase,
+            (False, True): profile_phase,
+            (True, False): (self.interviewer_agent, INTERVIEW_COMPLETE_SIGNAL, INTERVIEW_COMPLETE_STATE_KEY),
+            (True, True): (self.feedback_agent, None, None)
+        }
 
     async def _run_async_impl(self, context: InvocationContext):
-        # We use 'if not None' checks just to be safe, although they should be present
-        if self.session_agent is None or self.interviewer_agent is None:
-             raise ValueError("Agents not initialized correctly.")
-        # Check if SessionInitializer has completed the assessment
-        session_complete = False
-        interview_complete = False
+        # Completion flags are written to session state once, when the signal is first emitted
+        session_complete = bool(context.session.state.get(PROFILE_COMPLETE_STATE_KEY))
+        interview_complete = bool(context.session.state.get(INTERVIEW_COMPLETE_STATE_KEY))
+
+        log.debug("session_complete=%s interview_complete=%s", session_complete, interview_complete)
+        agent, signal, state_key = self._dispatch[(session_complete, interview_complete)]
+        async for event in self._run_with_cache(agent, context):
+            if signal is not None:
+                _record_completion(event, agent.name, signal, state_key)
+            # Stored as the user sees it: token stripped, cache hits included
+            lm_orchestrator.record(context.session.id, event)
+            yield event
+
+        # The turn ends once its events are stored, so stopping the server between turns
+        # loses none; writes from other sessions are not waited on
+        await lm_orchestrator.wait_for_pending(context.session.id)
+
+    async def _run_with_cache(self, agent: BaseAgent, context: InvocationContext):
+        """Run a sub-agent, short-circuiting byte-identical calls through the LLM cache."""
+        cache_key = _llm_cache_key(agent, context)
+        user_text = _user_turn_text(context) if cache_key is not None else ""
+        # L2 matches the turn by similarity, so it must only match within the same conversation
+        scope = _semantic_scope(agent, context) if user_text else ""
+        if cache_key is not None:
+            # Exact-match L1 first, then the embedding-similarity L2
+            llm_cache = get_llm_cache()
+            semantic_cache = get_semantic_cache()
+            cached = await llm_cache.get(cache_key)
+            if cached is None and user_text:
+                cached = await semantic_cache.lookup(agent.name, scope, user_text)
+                if cached is not None:
+                    # Backfill L1 so the identical prompt skips embedding next time
+                    await llm_cache.set(cache_key, cached)
+            if cached is None:
+                cached = await lm_batcher.join(cache_key)
+            if cached is not None:
+                yield _cached_event(agent, context, cached)
+                return
+            lm_batcher.lead(cache_key)
+
+        response_parts = []
+        response_text = None
         try:
-            # Check if any SessionInitializer message contains the completion signal
-            if hasattr(context.session, 'events'):
-                print("Checking for completion signal in events...")
-                for event in context.session.events:
-                    print("lOOPING THROUGH EVENTS")
-                    if (getattr(event, 'author', None) == 'SessionInitializer' and 
-                        hasattr(event, 'content') and 
-                        hasattr(event.content, 'parts')):
-                        for part in event.content.parts:
-                            print("LOOPING THROUGH SESSION INITIALIZER.")
-                            if hasattr(part, 'text'):
-                                print("TEXT FOUND")
-                                print(part.text)
-                            if hasattr(part, 'text') and 'PROFILE COMPLETE - Are you ready to begin technical interview practice?' in part.text:
-                                print("FOUND COMPLETION SIGNAL!")
-                                session_complete = True
-                                break
-                                print("🎯 Found completion signal! Switching to interviewer agent.")
-                    if (getattr(event, 'author', None) == 'InterviewConductor' and 
-                        hasattr(event, 'content') and 
-                        hasattr(event.content, 'parts')):
-                        for part in event.content.parts:
-                            if hasattr(part, 'text') and 'INTERVIEW COMPLETE - Ready for technical validation!' in part.text:
-                                interview_complete = True
-                                break
-                                print("🎯 Found completion signal! Switching to feedback agent.")
-                print(f"Session complete: {session_complete}")
-        except Exception as e:
-            print(f"Exception in completion check: {e}")
-            session_complete = False
-
-        print(f"Session complete: {session_complete}")
-        print(f"Interview complete: {interview_complete}")
-        if not session_complete:
-            async for event in self.session_agent.run_async(context):
-                yield event
-        elif session_complete and not interview_complete:
-            async for event in self.interviewer_agent.run_async(context):
-                yield event
-        elif session_complete and interview_complete:
-            async for event in self.feedback_agent.run_async(context):
+            async for event in agent.run_async(context):
+                if cache_key is not None and event.author == agent.name and event.is_final_response():
+                    response_parts.append(_event_text(event))
                 yield event
+            response_text = "".join(response_parts) or None
+        finally:
+            if cache_key is not None:
+                lm_batcher.release(cache_key, response_text)
+
+        if cache_key is not None and response_text:
+            await llm_cache.set(cache_key, response_text)
+            if user_text:
+                # Completion is the model's call for each session; a similar turn elsewhere
+                # must not replay the token that advances the phase
+                await semantic_cache.store(agent.name, scope, user_text,
+                                           _without_completion_signals(response_text))
 
 print("✅ session_agent created.")
 
-interviewer_agent = Agent(
-    name="InterviewConductor", 
-    model="gemini-2.5-flash-lite",
-    instruction="""You are the Interview Conductor for ATIC. 
-
-**PREREQUISITE:** You will receive the complete user profile and job description: {user_profile}
-
-**YOUR MISSION:** Conduct a comprehensive technical interview based on their background and target job.
-
-**INTERVIEW STRUCTURE:**
-1. **Welcome & Setup** - Acknowledge their background and explain the interview format
-2. **Technical Questions** - Based on their profile, ask:
-   - 2-3 coding problems (algorithms/data structures) appropriate for their level
-   - 1 system design question (if senior level)
-   - Follow-up questions to probe deeper understanding
-3. **Adaptive Difficulty** - Adjust question complexity based on their performance
-4. **Documentation** - Record all responses and your evaluation
-
-**EVALUATION CRITERIA:**
-For each response, assess:
-- Technical accuracy and completeness
-- Problem-solving approach and logic
-- Code quality and best practices (if coding)
-- Communication clarity and explanation ability
-
-**COMPLETION PROTOCOL:**
-- Continue until you've asked all planned questions
-- Document comprehensive results including:
-  - Questions asked and user responses
-  - Performance assessment for each area
-  - Overall interview evaluation
-- End with: "INTERVIEW COMPLETE - Ready for technical validation!"
-
-**KEY BEHAVIORS:**
-- Reference their specific background and target role
-- Maintain encouraging, professional tone
-- Provide hints when needed but note dependency
-- Track performance patterns throughout
-
-Focus on thorough assessment - the next agents will handle validation and feedback.""",
-    output_key="interview_results",
-)
-# Session Agent that conducts comprehensive assessment via web chat
-session_agent = Agent(
-    name="SessionInitializer",
-    model="gemini-2.5-flash-lite",
-   instruction="""You are the Session Assessment specialist for ATIC. Your ONLY responsibility is to collect comprehensive user information before any interview practice begins.
+# Sub-agent instructions as module constants so every use shares one string object
+_SESSION_INSTRUCTION = """You are the Session Assessment specialist for ATIC. Your ONLY responsibility is to collect comprehensive user information before any interview practice begins.
 
    **YOUR MISSION: Complete Data Collection**
 
@@ -170,8 +263,8 @@ session_agent = Agent(
 
    **COMPLETION PROTOCOL:**
    - Create a comprehensive structured summary of their profile
-   - MOST IMPORTANT STUFF When you have everything needed, end your message with exactly: 
-   "PROFILE COMPLETE - Are you ready to begin technical interview practice?"
+   - MOST IMPORTANT STUFF When you have everything needed, ask if they are ready to begin technical interview practice, then end your message with this exact token on its own final line:
+   <<ATIC_PROFILE_DONE_v1>>
    - DO NOT ATTEMPT TO ASK INTERVIEW QUESTIONS - THAT'S THE NEXT AGENT'S JOB
    - DO NOT give any senario or any other information that is not part of the profile.
    - DO NOT IN ANY WAY ASK INTERVIEW QUESTIONS - THAT'S THE NEXT AGENT'S JOB
@@ -186,14 +279,48 @@ session_agent = Agent(
    - JUST FOCUS ON THE PROFILE.
    - Stay focused solely on assessment and profile building
    - Don't ask too many questions, just ask what is needed to complete the profile.
-   - Also add JD analysis in the out put so that next agent can use it for interview.""",
-    output_key="user_profile"
-)
+   - Also add JD analysis in the out put so that next agent can use it for interview."""
 
-feedback_agent = Agent(
-    name="FeedbackAnalyzer",
-    model="gemini-2.5-flash-lite",
-    instruction="""You are the Performance Analysis and Feedback specialist for ATIC.
+_INTERVIEW_INSTRUCTION = """You are the Interview Conductor for ATIC. 
+
+**PREREQUISITE:** You will receive the complete user profile and job description: {user_profile}
+
+**YOUR MISSION:** Conduct a comprehensive technical interview based on their background and target job.
+
+**INTERVIEW STRUCTURE:**
+1. **Welcome & Setup** - Acknowledge their background and explain the interview format
+2. **Technical Questions** - Based on their profile, ask:
+   - 2-3 coding problems (algorithms/data structures) appropriate for their level
+   - 1 system design question (if senior level)
+   - Follow-up questions to probe deeper understanding
+3. **Adaptive Difficulty** - Adjust question complexity based on their performance
+4. **Documentation** - Record all responses and your evaluation
+
+**EVALUATION CRITERIA:**
+For each response, assess:
+- Technical accuracy and completeness
+- Problem-solving approach and logic
+- Code quality and best practices (if coding)
+- Communication clarity and explanation ability
+
+**COMPLETION PROTOCOL:**
+- Continue until you've asked all planned questions
+- Document comprehensive results including:
+  - Questions asked and user responses
+  - Performance assessment for each area
+  - Overall interview evaluation
+- Tell them the interview is complete, then end your message with this exact token on its own final line:
+  <<ATIC_INTERVIEW_DONE_v1>>
+
+**KEY BEHAVIORS:**
+- Reference their specific background and target role
+- Maintain encouraging, professional tone
+- Provide hints when needed but note dependency
+- Track performance patterns throughout
+
+Focus on thorough assessment - the next agents will handle validation and feedback."""
+
+_FEEDBACK_INSTRUCTION = """You are the Performance Analysis and Feedback specialist for ATIC.
 
 **INPUTS:** You have access to:
 - User profile: {user_profile}
@@ -234,7 +361,39 @@ feedback_agent = Agent(
 - Include specific, actionable next steps
 - End with: "📊 FEEDBACK COMPLETE - ATIC coaching session finished!"
 
-**TONE:** Supportive, constructive, and motivating while being specific and actionable.""",
+**TONE:** Supportive, constructive, and motivating while being specific and actionable."""
+
+# Digests computed once at import; cache keys carry these instead of the full instruction text
+_INSTRUCTION_DIGESTS = {
+    instruction: LLMCache.instruction_digest(instruction)
+    for instruction in (_SESSION_INSTRUCTION, _INTERVIEW_INSTRUCTION, _FEEDBACK_INSTRUCTION)
+}
+
+# Session state keys each instruction interpolates ({user_profile}, {interview_results})
+_STATE_PLACEHOLDER_RE = re.compile(r'\{(\w+)\}')
+_INSTRUCTION_STATE_KEYS = {
+    instruction: tuple(dict.fromkeys(_STATE_PLACEHOLDER_RE.findall(instruction)))
+    for instruction in (_SESSION_INSTRUCTION, _INTERVIEW_INSTRUCTION, _FEEDBACK_INSTRUCTION)
+}
+
+interviewer_agent = Agent(
+    name="InterviewConductor", 
+    model="gemini-2.5-flash-lite",
+    instruction=_INTERVIEW_INSTRUCTION,
+    output_key="interview_results",
+)
+# Session Agent that conducts comprehensive assessment via web chat
+session_agent = Agent(
+    name="SessionInitializer",
+    model="gemini-2.5-flash-lite",
+    instruction=_SESSION_INSTRUCTION,
+    output_key="user_profile"
+)
+
+feedback_agent = Agent(
+    name="FeedbackAnalyzer",
+    model="gemini-2.5-flash-lite",
+    instruction=_FEEDBACK_INSTRUCTION,
     output_key="final_feedback",
 )
 # For now, just use the session_agent as the root agent
@@ -0,0 +1,238 @@
+"""
+LLM Response Cache
+Author: Amin Motiwala
+
+Implements an exact-match response cache for the ATIC Gemini agents. Calls whose
+model, system instruction, conversation messages and temperature are byte-identical
+are answered from the cache instead of making a new model round-trip.
+"""
+
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Protocol, Tuple
+
+import orjson
+
+
+# 128-bit keys: collision-safe for a response cache, half the size of SHA-256 hex
+KEY_DIGEST_SIZE = 16
+
+
+class CacheBackend(Protocol):
+    """Storage interface used by LLMCache."""
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value for key, or None if missing/expired."""
+        ...
+
+    def set(self, key: str, value: str, ttl_seconds: Optional[int] = None) -> None:
+        """Store value under key, expiring after ttl_seconds (None = never)."""
+        ...
+
+    def clear(self) -> None:
+        """Remove every cached entry."""
+        ...
+
+
+class MemoryBackend:
+    """
+    In-process cache backend.
+
+    Entries live in a plain dict and are lost when the process exits.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[str, Optional[float]]] = {}
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        value, expires_at = entry
+        if expires_at is not None and expires_at < time.time():
+            del self._entries[key]
+            return None
+        return value
+
+    def set(self, key: str, value: str, ttl_seconds: Optional[int] = None) -> None:
+        expires_at = time.time() + ttl_seconds if ttl_seconds else None
+        self._entries[key] = (value, expires_at)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class SQLiteBackend:
+    """
+    Persistent cache backend stored alongside the Memory Bank tables.
+
+    Survives process restarts, which keeps dev reloads and replays cheap.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Initialize the SQLite cache backend.
+
+        Args:
+            db_path: Path to SQLite database file (defaults to the Memory Bank database)
+        """
+        if db_path is None:
+            # Same file as ATICSettings.DATABASE_PATH / MemoryBank default
+            db_dir = Path(__file__).parent / 'data'
+            db_dir.mkdir(exist_ok=True)
+            db_path = db_dir / 'atic_memory.db'
+
+        self.db_path = db_path
+        # LLMCache runs backend calls on worker threads; the lock serializes them on the
+        # shared connection
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.connection.execute('''
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                cache_key TEXT PRIMARY KEY,
+                created_at TEXT NOT NULL,
+                expires_at REAL,  -- Unix timestamp, NULL = never expires
+                response_text TEXT NOT NULL
+            )
+        ''')
+        self.connection.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self.connection.execute(
+                'SELECT response_text, expires_at FROM llm_cache WHERE cache_key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            response_text, expires_at = row
+            if expires_at is not None and expires_at < time.time():
+                self.connection.execute('DELETE FROM llm_cache WHERE cache_key = ?', (key,))
+                self.connection.commit()
+                return None
+            return response_text
+
+    def set(self, key: str, value: str, ttl_seconds: Optional[int] = None) -> None:
+        expires_at = time.time() + ttl_seconds if ttl_seconds else None
+        with self._lock:
+            self.connection.execute('''
+                INSERT OR REPLACE INTO llm_cache (cache_key, created_at, expires_at, response_text)
+                VALUES (?, ?, ?, ?)
+            ''', (key, datetime.now().isoformat(), expires_at, value))
+            self.connection.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self.connection.execute('DELETE FROM llm_cache')
+            self.connection.commit()
+
+    def close(self) -> None:
+        """Close database connection."""
+        if self.connection:
+            self.connection.close()
+
+
+class LLMCache:
+    """
+    Exact-match cache for model responses.
+
+    This class implements:
+    - Deterministic cache keys over model, instruction, messages and temperature
+    - Pluggable storage backends (in-memory or SQLite)
+    - Per-entry TTL expiry
+    - Hit/miss statistics
+    """
+
+    DEFAULT_TTL_SECONDS = 24 * 60 * 60
+
+    def __init__(self, backend: Optional[CacheBackend] = None,
+                 ttl_seconds: Optional[int] = DEFAULT_TTL_SECONDS):
+        """
+        Initialize the LLM cache.
+
+        Args:
+            backend: Storage backend (defaults to an in-memory backend)
+            ttl_seconds: Default lifetime of cached responses (None = never expire)
+        """
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttl_seconds = ttl_seconds
+        self.stats = {'hits': 0, 'misses': 0}
+
+    @staticmethod
+    def is_cacheable(temperature: Optional[float]) -> bool:
+        """
+        Only deterministic calls are cached.
+
+        Sampling at a non-zero (or unspecified) temperature is expected to produce
+        different answers, so freezing the first one would change agent behaviour.
+        """
+        return temperature == 0
+
+    @staticmethod
+    def cache_key(model: str, instruction: str, messages: List[Any], temperature: float) -> str:
+        """
+        Build the cache key for a model call.
+
+        Args:
+            model: Model name (e.g. 'gemini-2.5-flash-lite')
+            instruction: Digest of the system instruction (see instruction_digest)
+            messages: JSON-serializable conversation messages
+            temperature: Sampling temperature
+
+        Returns:
+            str: Hex digest identifying the call
+        """
+        payload = {
+            'model': model,
+            'instruction': instruction,
+            'messages': messages,
+            'temperature': temperature
+        }
+        # orjson returns bytes directly, so there is no separate UTF-8 encode pass.
+        # BLAKE2b is faster than SHA-256 and still stable across processes, which the
+        # SQLite backend relies on.
+        return hashlib.blake2b(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS),
+                               digest_size=KEY_DIGEST_SIZE).hexdigest()
+
+    @staticmethod
+    def instruction_digest(instruction: str) -> str:
+        """
+        Digest a system instruction for use in cache_key().
+
+        Instructions are static per agent, so callers compute this once and pass the
+        short digest instead of re-hashing multi-KB instruction text on every call.
+        """
+        return hashlib.blake2b(instruction.encode('utf-8'), digest_size=KEY_DIGEST_SIZE).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, updating hit/miss statistics."""
+        # Backends may block on disk I/O, so they run off the event loop
+        value = await asyncio.to_thread(self.backend.get, key)
+        if value is None:
+            self.stats['misses'] += 1
+        else:
+            self.stats['hits'] += 1
+        return value
+
+    async def set(self, key: str, value: str, ttl_seconds: Optional[int] = None) -> None:
+        """Cache a response, using the default TTL when none is given."""
+        await asyncio.to_thread(self.backend.set, key, value,
+                                ttl_seconds if ttl_seconds is not None else self.ttl_seconds)
+
+    def clear(self) -> None:
+        """Drop all cached responses and reset statistics."""
+        self.backend.clear()
+        self.stats = {'hits': 0, 'misses': 0}
+
+
+@lru_cache(maxsize=1)
+def get_llm_cache() -> LLMCache:
+    """Return the shared SQLite-backed LLM cache, opening the database on first use."""
+    return LLMCache(SQLiteBackend())
@@ -7,12 +7,249 @@ session history, performance metrics, and learning adaptations for continuous im
 """
 
 import json
+import logging
 import os
+import queue
+import threading
+import uuid
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from functools import lru_cache
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 import sqlite3
 from pathlib import Path
 
+import orjson
+
+try:
+    import zstandard
+except ImportError:  # Session records fall back to zlib compression
+    zstandard = None
+
+
+# Lazy %-style arguments: messages are only formatted when the level is enabled
+log = logging.getLogger("atic.memory")
+log.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+
+# Prepared statements kept per connection (sqlite3 default is 128)
+STATEMENT_CACHE_SIZE = 256
+
+# Per-connection tuning shared by the writer and every reader
+CONNECTION_PRAGMAS = (
+    'PRAGMA busy_timeout=5000',  # Wait for a competing lock instead of failing immediately
+    'PRAGMA cache_size=-65536',  # 64 MB page cache
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA mmap_size=268435456'
+)
+
+
+# One-byte codec tag in front of each compressed session_data BLOB
+# (rows written before compression are plain JSON TEXT)
+_CODEC_ZSTD = b'\x01'
+_CODEC_ZLIB = b'\x02'
+ZSTD_LEVEL = 3
+
+# zstandard contexts are not safe for concurrent use, so each thread keeps its own
+_zstd_contexts = threading.local()
+
+
+def _zstd_context(kind: str):
+    """Return this thread's zstandard compressor ('compress') or decompressor ('decompress')."""
+    context = getattr(_zstd_contexts, kind, None)
+    if context is None:
+        if kind == 'compress':
+            context = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+        else:
+            context = zstandard.ZstdDecompressor()
+        setattr(_zstd_contexts, kind, context)
+    return context
+
+
+def _dumps(value: Any) -> bytes:
+    """Encode JSON with orjson (non-JSON values fall back to str, as json.dumps(default=str))."""
+    return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _loads(data) -> Any:
+    """Decode JSON with orjson, falling back for legacy rows holding NaN/Infinity."""
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        # json.dumps wrote non-finite floats as bare NaN/Infinity, which orjson rejects
+        return json.loads(data)
+
+
+def _as_text(value: Any) -> Optional[str]:
+    """Store strings as-is in a TEXT column and JSON-encode any other value."""
+    if value is None or isinstance(value, str):
+        return value
+    return _dumps(value).decode()
+
+
+def _pack_session_data(session_data: Dict[str, Any]) -> bytes:
+    """Serialize a session record to a compressed, codec-tagged BLOB."""
+    raw = _dumps(session_data)
+    if zstandard is not None:
+        return _CODEC_ZSTD + _zstd_context('compress').compress(raw)
+    return _CODEC_ZLIB + zlib.compress(raw)
+
+
+def _unpack_session_data(value) -> Dict[str, Any]:
+    """Decode a session_data column value (compressed BLOB or legacy JSON TEXT)."""
+    if isinstance(value, str):
+        return _loads(value)
+    
+    codec, payload = value[:1], value[1:]
+    if codec == _CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read this session record")
+        return _loads(_zstd_context('decompress').decompress(payload))
+    return _loads(zlib.decompress(payload))
+
+
+# Statements used after initialization, defined once so every call passes the same
+# string to the connection's prepared-statement cache
+
+# created_at is left out of DO UPDATE so an existing profile keeps its creation time
+_SQL_UPSERT_PROFILE = '''
+    INSERT INTO user_profiles
+    (user_id, created_at, last_updated, experience_years, technical_field,
+     current_role, skill_levels, profile_data)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(user_id) DO UPDATE SET
+        last_updated = excluded.last_updated,
+        experience_years = excluded.experience_years,
+        technical_field = excluded.technical_field,
+        current_role = excluded.current_role,
+        skill_levels = excluded.skill_levels,
+        profile_data = excluded.profile_data
+'''
+
+_SQL_SELECT_PROFILE = 'SELECT * FROM user_profiles WHERE user_id = ?'
+
+# Filled in with one "path, json(value)" pair per updated key and the changed columns
+_SQL_PATCH_PROFILE = '''
+    UPDATE user_profiles
+    SET profile_data = json_set(profile_data, {paths}), {columns}
+    WHERE user_id = ?
+'''
+
+_SQL_INSERT_SESSION = '''
+    INSERT INTO sessions
+    (session_id, user_id, created_at, status, target_company, target_role,
+     difficulty_level, session_data)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+_SQL_COMPLETE_SESSION = '''
+    UPDATE sessions
+    SET completed_at = ?, status = 'completed', session_data = ?,
+        overall_score = ?, total_questions = ?
+    WHERE session_id = ?
+'''
+
+_SQL_INSERT_METRIC = '''
+    INSERT INTO performance_metrics
+    (session_id, user_id, recorded_at, category, metric_name, metric_value)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+_SQL_SELECT_PERFORMANCE_HISTORY = '''
+    SELECT session_data FROM sessions
+    WHERE user_id = ? AND status = 'completed'
+    ORDER BY completed_at DESC
+    LIMIT ?
+'''
+
+_SQL_SELECT_PERFORMANCE_SUMMARY = '''
+    SELECT session_id, completed_at, target_company, target_role, difficulty_level,
+           overall_score, total_questions
+    FROM sessions
+    WHERE user_id = ? AND status = 'completed'
+    ORDER BY completed_at DESC
+    LIMIT ?
+'''
+
+_SQL_SELECT_CATEGORY_TRENDS = '''
+    SELECT category,
+           COUNT(*) AS score_count,
+           AVG(metric_value) AS average_score,
+           first_score,
+           last_score
+    FROM (
+        SELECT category, metric_value, recorded_at, metric_id,
+               FIRST_VALUE(metric_value) OVER scores_in_order AS first_score,
+               LAST_VALUE(metric_value) OVER scores_in_order AS last_score
+        FROM performance_metrics
+        WHERE user_id = ? AND metric_name = 'category_score'
+        WINDOW scores_in_order AS (
+            PARTITION BY category ORDER BY recorded_at, metric_id
+            ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
+        )
+    )
+    GROUP BY category
+    ORDER BY MIN(recorded_at), MIN(metric_id)
+'''
+
+_SQL_COUNT_COMPLETED_SESSIONS = '''
+    SELECT COUNT(*) as session_count
+    FROM sessions
+    WHERE user_id = ? AND status = 'completed'
+'''
+
+_SQL_INSERT_QUESTION_PERFORMANCE = '''
+    INSERT INTO question_performance
+    (session_id, user_id, question_id, question_type, question_difficulty, topic_area,
+     response_time_seconds, accuracy_score, completeness_score, communication_score,
+     question_data, response_data)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+_SQL_INSERT_LEARNING_ADAPTATION = '''
+    INSERT INTO learning_adaptations
+    (user_id, session_id, created_at, adaptation_type, previous_value, new_value,
+     reason, effectiveness_score, adaptation_data)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+_SQL_INSERT_AGENT_EVENT = '''
+    INSERT INTO agent_events
+    (session_id, event_id, invocation_id, author, recorded_at, content_text)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+_SQL_SELECT_USER_STATISTICS = '''
+    WITH session_stats AS (
+        SELECT COUNT(*) AS total,
+               SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) AS completed,
+               MAX(CASE WHEN status = 'completed' THEN completed_at END) AS last_session
+        FROM sessions WHERE user_id = :user_id
+    ),
+    perf_stats AS (
+        SELECT AVG(metric_value) AS avg_score, MAX(metric_value) AS best_score
+        FROM performance_metrics
+        WHERE user_id = :user_id AND metric_name = 'session_score'
+    )
+    SELECT (SELECT created_at FROM user_profiles WHERE user_id = :user_id) AS profile_created,
+           session_stats.total, session_stats.completed, session_stats.last_session,
+           perf_stats.avg_score, perf_stats.best_score,
+           (SELECT COUNT(*) FROM question_performance WHERE user_id = :user_id) AS question_count
+    FROM session_stats, perf_stats
+'''
+
+_SQL_DELETE_OLD_METRICS = '''
+    DELETE FROM performance_metrics
+    WHERE recorded_at < ?
+'''
+
+_SQL_DELETE_OLD_SESSIONS = '''
+    DELETE FROM sessions
+    WHERE created_at < ? AND status = 'completed'
+'''
+
 
 class MemoryBank:
     """
@@ -24,14 +261,21 @@ class MemoryBank:
     - Learning adaptation data persistence
     - Query and analysis capabilities
     - Data export and backup functionality
+    - One writer connection plus a pool of read-only connections
+    - LRU cache of decoded user profiles, invalidated on writes
     """
     
-    def __init__(self, db_path: Optional[str] = None):
+    # Matches ATICSettings.SQLITE_POOL_SIZE (one reader per concurrent session)
+    DEFAULT_READ_POOL_SIZE = 5
+    PROFILE_CACHE_SIZE = 256
+    
+    def __init__(self, db_path: Optional[str] = None, read_pool_size: int = DEFAULT_READ_POOL_SIZE):
         """
         Initialize the Memory Bank with persistent storage.
         
         Args:
             db_path: Path to SQLite database file (creates if doesn't exist)
+            read_pool_size: Number of read-only connections serving queries
         """
         if db_path is None:
             # Create default database in memory directory
@@ -40,15 +284,39 @@ class MemoryBank:
             db_path = db_dir / 'atic_memory.db'
         
         self.db_path = db_path
-        self.connection = None
+        self.in_memory = str(db_path) == ':memory:'
+        self._writer = None
+        # Writes from different threads share one connection; the lock keeps their
+        # transactions from interleaving (re-entrant for nested store_* calls)
+        self._write_lock = threading.RLock()
+        self.read_pool_size = read_pool_size
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        # Decoded profiles by user_id; the generation counter stops a read that raced a
+        # write from caching the pre-write profile
+        self._profile_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._profile_cache_lock = threading.Lock()
+        self._profile_generation = 0
         self._initialize_database()
+        self._initialize_read_pool()
     
     def _initialize_database(self) -> None:
         """Initialize SQLite database with required tables."""
-        self.connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
-        self.connection.row_factory = sqlite3.Row  # Enable dict-like access
+        # Single writer: SQLite serializes writes anyway, so one connection owns them
+        self._writer = sqlite3.connect(str(self.db_path), check_same_thread=False,
+                                          cached_statements=STATEMENT_CACHE_SIZE)
+        self._writer.row_factory = sqlite3.Row  # Enable dict-like access
+        
+        for pragma in CONNECTION_PRAGMAS:
+            self._writer.execute(pragma)
+        # Lets cleanup_old_data hand freed pages back; only takes effect on a new database
+        self._writer.execute('PRAGMA auto_vacuum=INCREMENTAL')
+        if not self.in_memory:
+            # WAL lets the read pool proceed while a write is in progress, and with it
+            # synchronous=NORMAL only fsyncs at checkpoints instead of on every commit
+            self._writer.execute('PRAGMA journal_mode=WAL')
+            self._writer.execute('PRAGMA synchronous=NORMAL')
         
-        cursor = self.connection.cursor()
+        cursor = self._writer.cursor()
         
         # User profiles table
         cursor.execute('''
@@ -76,11 +344,19 @@ class MemoryBank:
                 target_company TEXT,
                 target_role TEXT,
                 difficulty_level TEXT,
-                session_data TEXT,  -- JSON string for full session data
+                session_data BLOB,  -- Compressed JSON of the full session data (see _pack_session_data)
+                overall_score REAL,  -- Denormalized from session_data on completion
+                total_questions INTEGER,  -- Denormalized from session_data on completion
                 FOREIGN KEY (user_id) REFERENCES user_profiles (user_id)
             )
         ''')
         
+        # Databases created before the denormalized columns existed
+        session_columns = {row['name'] for row in cursor.execute('PRAGMA table_info(sessions)')}
+        for column, column_type in (('overall_score', 'REAL'), ('total_questions', 'INTEGER')):
+            if column not in session_columns:
+                cursor.execute(f'ALTER TABLE sessions ADD COLUMN {column} {column_type}')
+        
         # Performance metrics table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS performance_metrics (
@@ -136,8 +412,80 @@ class MemoryBank:
             )
         ''')
         
-        self.connection.commit()
-        print(f"💾 Memory Bank initialized with database: {self.db_path}")
+        # Agent events table (conversation log of the web agents)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS agent_events (
+                event_row_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                event_id TEXT,
+                invocation_id TEXT,
+                author TEXT,
+                recorded_at TEXT NOT NULL,
+                content_text TEXT
+            )
+        ''')
+        
+        # Indexes for the per-user history/statistics queries
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_sessions_user_status_completed
+            ON sessions (user_id, status, completed_at DESC)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_metrics_user_name_time
+            ON performance_metrics (user_id, metric_name, recorded_at)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_qperf_user
+            ON question_performance (user_id)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_adapt_user_time
+            ON learning_adaptations (user_id, created_at DESC)
+        ''')
+        
+        # Indexes for the retention cutoffs in cleanup_old_data
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_metrics_recorded_at
+            ON performance_metrics (recorded_at)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_sessions_status_created
+            ON sessions (status, created_at)
+        ''')
+        
+        self._writer.commit()
+        log.info("💾 Memory Bank initialized with database: %s", self.db_path)
+    
+    def _initialize_read_pool(self) -> None:
+        """Open the read-only connections used by query methods."""
+        if self.in_memory:
+            # A private in-memory database is only visible to the connection that created it
+            self._readers.put(self._writer)
+            return
+        
+        read_uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+        for _ in range(self.read_pool_size):
+            reader = sqlite3.connect(read_uri, uri=True, check_same_thread=False,
+                                     cached_statements=STATEMENT_CACHE_SIZE)
+            reader.row_factory = sqlite3.Row
+            for pragma in CONNECTION_PRAGMAS:
+                reader.execute(pragma)
+            self._readers.put(reader)
+    
+    @contextmanager
+    def _writing(self) -> Iterator[sqlite3.Connection]:
+        """Run a write transaction on the writer connection, committing on success."""
+        with self._write_lock, self._writer:
+            yield self._writer
+    
+    @contextmanager
+    def _reader(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a read-only connection, waiting while all of them are in use."""
+        reader = self._readers.get()
+        try:
+            yield reader
+        finally:
+            self._readers.put(reader)
     
     def store_user_profile(self, profile_data: Dict[str, Any]) -> bool:
         """
@@ -150,56 +498,29 @@ class MemoryBank:
             bool: Success status
         """
         try:
-            user_id = profile_data.get('user_id', self._generate_user_id(profile_data))
+            # Only generate an ID for profiles that arrive without one
+            user_id = profile_data.get('user_id') or self._generate_user_id(profile_data)
             profile_data['user_id'] = user_id  # Ensure user_id is in profile
-            
-            cursor = self.connection.cursor()
-            
-            # Check if user exists
-            cursor.execute('SELECT user_id FROM user_profiles WHERE user_id = ?', (user_id,))
-            exists = cursor.fetchone() is not None
-            
+            now = datetime.now().isoformat()
             experience_data = profile_data.get('experience', {})
             
-            if exists:
-                # Update existing profile
-                cursor.execute('''
-                    UPDATE user_profiles 
-                    SET last_updated = ?, experience_years = ?, technical_field = ?, 
-                        current_role = ?, skill_levels = ?, profile_data = ?
-                    WHERE user_id = ?
-                ''', (
-                    datetime.now().isoformat(),
-                    experience_data.get('years', 0),
-                    experience_data.get('field', ''),
-                    experience_data.get('current_role', ''),
-                    json.dumps(experience_data.get('self_assessment', {})),
-                    json.dumps(profile_data),
-                    user_id
-                ))
-            else:
-                # Insert new profile
-                cursor.execute('''
-                    INSERT INTO user_profiles 
-                    (user_id, created_at, last_updated, experience_years, technical_field, 
-                     current_role, skill_levels, profile_data)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
+            with self._writing() as writer:
+                writer.execute(_SQL_UPSERT_PROFILE, (
                     user_id,
-                    datetime.now().isoformat(),
-                    datetime.now().isoformat(),
+                    now,
+                    now,
                     experience_data.get('years', 0),
                     experience_data.get('field', ''),
                     experience_data.get('current_role', ''),
-                    json.dumps(experience_data.get('self_assessment', {})),
-                    json.dumps(profile_data)
+                    _dumps(experience_data.get('self_assessment', {})).decode(),
+                    _dumps(profile_data).decode()
                 ))
+            self._invalidate_profiles(user_id)
             
-            self.connection.commit()
             return True
             
         except Exception as e:
-            print(f"❌ Error storing user profile: {e}")
+            log.error("❌ Error storing user profile: %s", e, exc_info=True)
             return False
     
     def get_user_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
@@ -210,24 +531,41 @@ class MemoryBank:
             user_id: Unique user identifier
             
         Returns:
-            Dict containing user profile or None if not found
+            Dict containing user profile or None if not found. Top-level keys are a
+            fresh copy; nested values are shared with the profile cache, so change a
+            profile through update_user_profile rather than in place.
         """
         try:
-            cursor = self.connection.cursor()
-            cursor.execute('SELECT * FROM user_profiles WHERE user_id = ?', (user_id,))
-            row = cursor.fetchone()
-            
-            if row:
-                profile_data = json.loads(row['profile_data'])
-                profile_data['db_metadata'] = {
-                    'created_at': row['created_at'],
-                    'last_updated': row['last_updated']
-                }
-                return profile_data
-            return None
+            with self._profile_cache_lock:
+                profile_data = self._profile_cache.get(user_id)
+                if profile_data is not None:
+                    self._profile_cache.move_to_end(user_id)
+                    return {**profile_data, 'db_metadata': dict(profile_data['db_metadata'])}
+                generation = self._profile_generation
+            
+            with self._reader() as reader:
+                cursor = reader.cursor()
+                cursor.execute(_SQL_SELECT_PROFILE, (user_id,))
+                row = cursor.fetchone()
+            
+            if row is None:
+                return None
+            
+            profile_data = _loads(row['profile_data'])
+            profile_data['db_metadata'] = {
+                'created_at': row['created_at'],
+                'last_updated': row['last_updated']
+            }
+            
+            with self._profile_cache_lock:
+                if generation == self._profile_generation:
+                    self._profile_cache[user_id] = profile_data
+                    if len(self._profile_cache) > self.PROFILE_CACHE_SIZE:
+                        self._profile_cache.popitem(last=False)
+            return {**profile_data, 'db_metadata': dict(profile_data['db_metadata'])}
             
         except Exception as e:
-            print(f"❌ Error retrieving user profile: {e}")
+            log.error("❌ Error retrieving user profile: %s", e, exc_info=True)
             return None
     
     def store_session_initialization(self, session_data: Dict[str, Any]) -> bool:
@@ -250,29 +588,26 @@ class MemoryBank:
                 self.store_user_profile(user_profile)
             
             user_id = user_profile.get('user_id', session_id)  # Use session_id as fallback
+            # Only stamp sessions that arrive without a creation time
+            created_at = session_data.get('created_at') or datetime.now().isoformat()
+            
+            with self._writing() as writer:
+                cursor = writer.cursor()
+                cursor.execute(_SQL_INSERT_SESSION, (
+                    session_id,
+                    user_id,
+                    created_at,
+                    session_data.get('status', 'initialized'),
+                    target_job.get('company', ''),
+                    target_job.get('role', ''),
+                    user_profile.get('difficulty_level', 'intermediate'),
+                    _pack_session_data(session_data)
+                ))
             
-            cursor = self.connection.cursor()
-            cursor.execute('''
-                INSERT INTO sessions 
-                (session_id, user_id, created_at, status, target_company, target_role, 
-                 difficulty_level, session_data)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                session_id,
-                user_id,
-                session_data.get('created_at', datetime.now().isoformat()),
-                session_data.get('status', 'initialized'),
-                target_job.get('company', ''),
-                target_job.get('role', ''),
-                user_profile.get('difficulty_level', 'intermediate'),
-                json.dumps(session_data)
-            ))
-            
-            self.connection.commit()
             return True
             
         except Exception as e:
-            print(f"❌ Error storing session initialization: {e}")
+            log.error("❌ Error storing session initialization: %s", e, exc_info=True)
             return False
     
     def store_session_record(self, session_record: Dict[str, Any]) -> bool:
@@ -290,48 +625,31 @@ class MemoryBank:
             user_profile = session_record.get('user_profile', {})
             user_id = user_profile.get('user_id', session_id)
             
-            # Update session completion
-            cursor = self.connection.cursor()
-            cursor.execute('''
-                UPDATE sessions 
-                SET completed_at = ?, status = 'completed', session_data = ?
-                WHERE session_id = ?
-            ''', (
-                session_record['timestamp'],
-                json.dumps(session_record),
-                session_id
-            ))
-            
-            # Store performance metrics
+            # Performance metrics: one row per category plus the overall score
+            timestamp = session_record['timestamp']
             performance_analysis = session_record.get('performance_analysis', {})
             category_scores = performance_analysis.get('category_scores', {})
-            
-            for category, score in category_scores.items():
-                cursor.execute('''
-                    INSERT INTO performance_metrics 
-                    (session_id, user_id, recorded_at, category, metric_name, metric_value)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (
-                    session_id, user_id, session_record['timestamp'], 
-                    category, 'category_score', score
+            overall_score = performance_analysis.get('overall_score', 0.0)
+            total_questions = len(session_record.get('questions', []))
+            
+            metric_rows = [
+                (session_id, user_id, timestamp, category, 'category_score', score)
+                for category, score in category_scores.items()
+            ]
+            metric_rows.append((session_id, user_id, timestamp, 'overall', 'session_score', overall_score))
+            
+            # Session update and all metrics commit together (or roll back together)
+            with self._writing() as writer:
+                writer.execute(_SQL_COMPLETE_SESSION, (
+                    timestamp, _pack_session_data(session_record), overall_score, total_questions, session_id
                 ))
+                
+                writer.executemany(_SQL_INSERT_METRIC, metric_rows)
             
-            # Store overall performance score
-            overall_score = performance_analysis.get('overall_score', 0.0)
-            cursor.execute('''
-                INSERT INTO performance_metrics 
-                (session_id, user_id, recorded_at, category, metric_name, metric_value)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                session_id, user_id, session_record['timestamp'], 
-                'overall', 'session_score', overall_score
-            ))
-            
-            self.connection.commit()
             return True
             
         except Exception as e:
-            print(f"❌ Error storing session record: {e}")
+            log.error("❌ Error storing session record: %s", e, exc_info=True)
             return False
     
     def store_completed_session(self, session_data: Dict[str, Any]) -> bool:
@@ -346,39 +664,52 @@ class MemoryBank:
         """
         return self.store_session_record(session_data)
     
-    def get_performance_history(self, user_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+    def get_performance_history(self, user_id: str, limit: int = 10,
+                                include_session_data: bool = True) -> List[Dict[str, Any]]:
         """
         Get performance history for a user.
         
         Args:
             user_id: User identifier
             limit: Maximum number of sessions to return
+            include_session_data: Return the full stored session records; when False,
+                only the denormalized summary columns are read (no JSON decoding)
             
         Returns:
             List of session performance data
         """
         try:
-            cursor = self.connection.cursor()
-            cursor.execute('''
-                SELECT session_data FROM sessions 
-                WHERE user_id = ? AND status = 'completed'
-                ORDER BY completed_at DESC 
-                LIMIT ?
-            ''', (user_id, limit))
-            
-            rows = cursor.fetchall()
-            history = []
-            
-            for row in rows:
-                session_data = json.loads(row['session_data'])
-                history.append(session_data)
+            with self._reader() as reader:
+                cursor = reader.cursor()
+                
+                if not include_session_data:
+                    cursor.execute(_SQL_SELECT_PERFORMANCE_SUMMARY, (user_id, limit))
+                    return [dict(row) for row in cursor]
             
-            return history
+            # Rows are decoded as the cursor steps, never held twice
+            return list(self.iter_performance_history(user_id, limit))
             
         except Exception as e:
-            print(f"❌ Error retrieving performance history: {e}")
+            log.error("❌ Error retrieving performance history: %s", e, exc_info=True)
             return []
     
+    def iter_performance_history(self, user_id: str, limit: int = 10) -> Iterator[Dict[str, Any]]:
+        """
+        Yield a user's completed session records, newest first, one row at a time.
+        
+        Holds a pooled read connection until the iterator is exhausted or closed.
+        
+        Args:
+            user_id: User identifier
+            limit: Maximum number of sessions to yield
+            
+        Yields:
+            Stored session records
+        """
+        with self._reader() as reader:
+            for row in reader.execute(_SQL_SELECT_PERFORMANCE_HISTORY, (user_id, limit)):
+                yield _unpack_session_data(row['session_data'])
+    
     def get_learning_insights(self, user_id: str) -> Dict[str, Any]:
         """
         Generate learning insights based on stored data.
@@ -390,77 +721,60 @@ class MemoryBank:
             Dict containing learning insights and recommendations
         """
         try:
-            cursor = self.connection.cursor()
+            with self._reader() as reader:
+                cursor = reader.cursor()
             
-            # Get performance trends
-            cursor.execute('''
-                SELECT category, metric_value, recorded_at 
-                FROM performance_metrics 
-                WHERE user_id = ? AND metric_name = 'category_score'
-                ORDER BY recorded_at ASC
-            ''', (user_id,))
+                # Per-category performance trends, aggregated in SQL
+                cursor.execute(_SQL_SELECT_CATEGORY_TRENDS, (user_id,))
             
-            metrics = cursor.fetchall()
+                metrics = cursor.fetchall()
             
-            insights = {
-                'user_id': user_id,
-                'total_sessions': 0,
-                'performance_trends': {},
-                'improvement_areas': [],
-                'strong_areas': [],
-                'learning_velocity': 'moderate',
-                'recommendations': []
-            }
+                insights = {
+                    'user_id': user_id,
+                    'total_sessions': 0,
+                    'performance_trends': {},
+                    'improvement_areas': [],
+                    'strong_areas': [],
+                    'learning_velocity': 'moderate',
+                    'recommendations': []
+                }
             
-            if not metrics:
-                return insights
+                if not metrics:
+                    return insights
             
-            # Count total sessions
-            cursor.execute('''
-                SELECT COUNT(*) as session_count 
-                FROM sessions 
-                WHERE user_id = ? AND status = 'completed'
-            ''', (user_id,))
-            
-            session_count = cursor.fetchone()['session_count']
-            insights['total_sessions'] = session_count
-            
-            # Analyze performance trends by category
-            category_performance = {}
-            for metric in metrics:
-                category = metric['category']
-                score = metric['metric_value']
-                
-                if category not in category_performance:
-                    category_performance[category] = []
-                category_performance[category].append(score)
-            
-            # Calculate trends and identify areas
-            for category, scores in category_performance.items():
-                if len(scores) >= 2:
-                    trend = scores[-1] - scores[0]  # Simple trend calculation
-                    avg_score = sum(scores) / len(scores)
+                # Count total sessions
+                cursor.execute(_SQL_COUNT_COMPLETED_SESSIONS, (user_id,))
+            
+                session_count = cursor.fetchone()['session_count']
+                insights['total_sessions'] = session_count
+            
+                # Calculate trends and identify areas
+                for metric in metrics:
+                    category = metric['category']
+                    if metric['score_count'] >= 2:
+                        trend = metric['last_score'] - metric['first_score']  # Simple trend calculation
+                        avg_score = metric['average_score']
                     
-                    insights['performance_trends'][category] = {
-                        'current_score': scores[-1],
-                        'average_score': avg_score,
-                        'trend': 'improving' if trend > 0.1 else 'declining' if trend < -0.1 else 'stable',
-                        'sessions_tracked': len(scores)
-                    }
+                        insights['performance_trends'][category] = {
+                            'current_score': metric['last_score'],
+                            'average_score': avg_score,
+                            'trend': 'improving' if trend > 0.1 else 'declining' if trend < -0.1 else 'stable',
+                            'sessions_tracked': metric['score_count']
+                        }
                     
-                    # Categorize as strong or needs improvement
-                    if avg_score >= 0.7:
-                        insights['strong_areas'].append(category)
-                    elif avg_score < 0.5:
-                        insights['improvement_areas'].append(category)
+                        # Categorize as strong or needs improvement
+                        if avg_score >= 0.7:
+                            insights['strong_areas'].append(category)
+                        elif avg_score < 0.5:
+                            insights['improvement_areas'].append(category)
             
-            # Generate recommendations
-            insights['recommendations'] = self._generate_learning_recommendations(insights)
+                # Generate recommendations
+                insights['recommendations'] = self._generate_learning_recommendations(insights)
             
-            return insights
+                return insights
             
         except Exception as e:
-            print(f"❌ Error generating learning insights: {e}")
+            log.error("❌ Error generating learning insights: %s", e, exc_info=True)
             return {'user_id': user_id, 'error': str(e)}
     
     def update_user_profile(self, user_id: str, updates: Dict[str, Any]) -> bool:
@@ -475,20 +789,40 @@ class MemoryBank:
             bool: Success status
         """
         try:
-            # Get current profile
-            current_profile = self.get_user_profile(user_id)
-            if not current_profile:
-                return False
-            
-            # Apply updates
-            current_profile.update(updates)
-            current_profile['last_updated'] = datetime.now().isoformat()
+            now = datetime.now().isoformat()
+            updates = {**updates, 'last_updated': now}
+            
+            # json_set replaces each top-level key in place, like dict.update(), without
+            # reading the stored profile back into Python
+            paths = ", ".join("?, json(?)" for _ in updates)
+            params: List[Any] = []
+            for key, value in updates.items():
+                params.extend((f"$.{_dumps(key).decode()}", _dumps(value).decode()))
+            
+            # Keep the indexed columns in sync with the profile blob
+            columns = {'last_updated': now}
+            if 'experience' in updates:
+                experience_data = updates['experience'] or {}
+                columns.update({
+                    'experience_years': experience_data.get('years', 0),
+                    'technical_field': experience_data.get('field', ''),
+                    'current_role': experience_data.get('current_role', ''),
+                    'skill_levels': _dumps(experience_data.get('self_assessment', {})).decode()
+                })
+            params.extend(columns.values())
+            params.append(user_id)
+            
+            sql = _SQL_PATCH_PROFILE.format(
+                paths=paths, columns=", ".join(f"{column} = ?" for column in columns)
+            )
+            with self._writing() as writer:
+                cursor = writer.execute(sql, params)
+            self._invalidate_profiles(user_id)
             
-            # Store updated profile
-            return self.store_user_profile(current_profile)
+            return cursor.rowcount > 0
             
         except Exception as e:
-            print(f"❌ Error updating user profile: {e}")
+            log.error("❌ Error updating user profile: %s", e, exc_info=True)
             return False
     
     def store_question_performance(self, session_id: str, user_id: str, question_data: Dict, 
@@ -503,37 +837,139 @@ class MemoryBank:
             response_data: User response
             scores: Performance scores for the question
             
+        Returns:
+            bool: Success status
+        """
+        return self.store_question_performances(
+            session_id, user_id, [(question_data, response_data, scores)]
+        )
+    
+    def store_question_performances(self, session_id: str, user_id: str,
+                                    items: List[Tuple[Dict, Dict, Dict[str, float]]]) -> bool:
+        """
+        Store performance data for several questions in one transaction.
+        
+        Args:
+            session_id: Session identifier
+            user_id: User identifier
+            items: (question_data, response_data, scores) per question
+            
         Returns:
             bool: Success status
         """
         try:
-            cursor = self.connection.cursor()
-            cursor.execute('''
-                INSERT INTO question_performance 
-                (session_id, user_id, question_id, question_type, question_difficulty, topic_area,
-                 response_time_seconds, accuracy_score, completeness_score, communication_score,
-                 question_data, response_data)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                session_id,
-                user_id,
-                question_data.get('question_id', f"{session_id}_{len(question_data)}"),
-                question_data.get('type', 'unknown'),
-                question_data.get('difficulty', 'intermediate'),
-                question_data.get('topic', 'general'),
-                response_data.get('time_taken', 0),
-                scores.get('accuracy_score', 0.0),
-                scores.get('completeness_score', 0.0),
-                scores.get('communication_score', 0.0),
-                json.dumps(question_data),
-                json.dumps(response_data)
-            ))
-            
-            self.connection.commit()
+            rows = (
+                (
+                    session_id,
+                    user_id,
+                    question_data.get('question_id', f"{session_id}_{len(question_data)}"),
+                    question_data.get('type', 'unknown'),
+                    question_data.get('difficulty', 'intermediate'),
+                    question_data.get('topic', 'general'),
+                    response_data.get('time_taken', 0),
+                    scores.get('accuracy_score', 0.0),
+                    scores.get('completeness_score', 0.0),
+                    scores.get('communication_score', 0.0),
+                    _dumps(question_data).decode(),
+                    _dumps(response_data).decode()
+                )
+                for question_data, response_data, scores in items
+            )
+            
+            with self._writing() as writer:
+                writer.executemany(_SQL_INSERT_QUESTION_PERFORMANCE, rows)
+            
             return True
             
         except Exception as e:
-            print(f"❌ Error storing question performance: {e}")
+            log.error("❌ Error storing question performance: %s", e, exc_info=True)
+            return False
+    
+    def store_learning_adaptation(self, session_id: str, user_id: str,
+                                  adaptation: Dict[str, Any]) -> bool:
+        """
+        Store a single learning adaptation (e.g. a difficulty adjustment).
+        
+        Args:
+            session_id: Session identifier
+            user_id: User identifier
+            adaptation: Adaptation details (adaptation_type, previous_value, new_value,
+                reason, effectiveness_score)
+            
+        Returns:
+            bool: Success status
+        """
+        return self.store_learning_adaptations(session_id, user_id, [adaptation])
+    
+    def store_learning_adaptations(self, session_id: str, user_id: str,
+                                   adaptations: List[Dict[str, Any]]) -> bool:
+        """
+        Store several learning adaptations in one transaction.
+        
+        Args:
+            session_id: Session identifier
+            user_id: User identifier
+            adaptations: Adaptation details, one dict per adaptation
+            
+        Returns:
+            bool: Success status
+        """
+        try:
+            now = datetime.now().isoformat()
+            rows = (
+                (
+                    user_id,
+                    session_id,
+                    adaptation.get('created_at') or now,
+                    adaptation.get('adaptation_type', 'unknown'),
+                    _as_text(adaptation.get('previous_value')),
+                    _as_text(adaptation.get('new_value')),
+                    adaptation.get('reason', ''),
+                    adaptation.get('effectiveness_score'),
+                    _dumps(adaptation).decode()
+                )
+                for adaptation in adaptations
+            )
+            
+            with self._writing() as writer:
+                writer.executemany(_SQL_INSERT_LEARNING_ADAPTATION, rows)
+            
+            return True
+            
+        except Exception as e:
+            log.error("❌ Error storing learning adaptation: %s", e, exc_info=True)
+            return False
+    
+    def store_agent_event(self, session_id: str, event_data: Dict[str, Any]) -> bool:
+        """
+        Store a single agent event from the web agent conversation.
+        
+        Args:
+            session_id: ADK session identifier
+            event_data: Event fields (event_id, invocation_id, author, timestamp, content_text)
+            
+        Returns:
+            bool: Success status
+        """
+        try:
+            timestamp = event_data.get('timestamp')
+            recorded_at = datetime.fromtimestamp(timestamp).isoformat() if timestamp else datetime.now().isoformat()
+            
+            with self._writing() as writer:
+                cursor = writer.cursor()
+                cursor.execute(_SQL_INSERT_AGENT_EVENT, (
+                    session_id,
+                    event_data.get('event_id', ''),
+                    event_data.get('invocation_id', ''),
+                    event_data.get('author', ''),
+                    recorded_at,
+                    event_data.get('content_text', '')
+                ))
+            
+            return True
+            
+        except Exception as e:
+            log.error("❌ Error storing agent event: %s", e, exc_info=True)
             return False
     
     def get_user_statistics(self, user_id: str) -> Dict[str, Any]:
@@ -547,8 +983,6 @@ class MemoryBank:
             Dict containing user statistics
         """
         try:
-            cursor = self.connection.cursor()
-            
             stats = {
                 'user_id': user_id,
                 'profile_created': '',
@@ -562,54 +996,29 @@ class MemoryBank:
                 'time_invested_minutes': 0
             }
             
-            # Basic profile info
-            cursor.execute('SELECT created_at FROM user_profiles WHERE user_id = ?', (user_id,))
-            profile_row = cursor.fetchone()
-            if profile_row:
-                stats['profile_created'] = profile_row['created_at']
-            
-            # Session statistics
-            cursor.execute('''
-                SELECT COUNT(*) as total, 
-                       SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as completed
-                FROM sessions WHERE user_id = ?
-            ''', (user_id,))
-            session_stats = cursor.fetchone()
-            stats['total_sessions'] = session_stats['total']
-            stats['completed_sessions'] = session_stats['completed']
-            
-            # Performance statistics
-            cursor.execute('''
-                SELECT AVG(metric_value) as avg_score, MAX(metric_value) as best_score
-                FROM performance_metrics 
-                WHERE user_id = ? AND metric_name = 'session_score'
-            ''', (user_id,))
-            perf_stats = cursor.fetchone()
-            if perf_stats['avg_score']:
-                stats['average_session_score'] = round(perf_stats['avg_score'], 3)
-                stats['best_session_score'] = round(perf_stats['best_score'], 3)
-            
-            # Questions answered
-            cursor.execute('''
-                SELECT COUNT(*) as question_count 
-                FROM question_performance WHERE user_id = ?
-            ''', (user_id,))
-            q_stats = cursor.fetchone()
-            stats['total_questions_answered'] = q_stats['question_count']
-            
-            # Recent activity
-            cursor.execute('''
-                SELECT MAX(completed_at) as last_session 
-                FROM sessions WHERE user_id = ? AND status = 'completed'
-            ''', (user_id,))
-            recent = cursor.fetchone()
-            if recent['last_session']:
-                stats['recent_activity'] = recent['last_session']
+            # Profile, session, performance, question and activity figures in one statement
+            with self._reader() as reader:
+                row = reader.execute(_SQL_SELECT_USER_STATISTICS, {'user_id': user_id}).fetchone()
+            
+            if row['profile_created']:
+                stats['profile_created'] = row['profile_created']
+            
+            stats['total_sessions'] = row['total']
+            stats['completed_sessions'] = row['completed']
+            
+            if row['avg_score']:
+                stats['average_session_score'] = round(row['avg_score'], 3)
+                stats['best_session_score'] = round(row['best_score'], 3)
+            
+            stats['total_questions_answered'] = row['question_count']
+            
+            if row['last_session']:
+                stats['recent_activity'] = row['last_session']
             
             return stats
             
         except Exception as e:
-            print(f"❌ Error getting user statistics: {e}")
+            log.error("❌ Error getting user statistics: %s", e, exc_info=True)
             return {'user_id': user_id, 'error': str(e)}
     
     def export_user_data(self, user_id: str, export_path: Optional[str] = None) -> str:
@@ -624,34 +1033,39 @@ class MemoryBank:
             str: Path to exported file
         """
         try:
+            exported_at = datetime.now()
             if export_path is None:
                 export_dir = Path(__file__).parent / 'exports'
                 export_dir.mkdir(exist_ok=True)
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                timestamp = exported_at.strftime('%Y%m%d_%H%M%S')
                 export_path = export_dir / f"atic_export_{user_id}_{timestamp}.json"
             
-            # Collect all user data
-            export_data = {
-                'export_metadata': {
-                    'user_id': user_id,
-                    'export_timestamp': datetime.now().isoformat(),
-                    'export_version': '1.0'
-                },
-                'user_profile': self.get_user_profile(user_id),
-                'performance_history': self.get_performance_history(user_id, limit=100),
-                'learning_insights': self.get_learning_insights(user_id),
-                'user_statistics': self.get_user_statistics(user_id)
+            export_metadata = {
+                'user_id': user_id,
+                'export_timestamp': exported_at.isoformat(),
+                'export_version': '1.0'
             }
             
-            # Write to file
-            with open(export_path, 'w') as f:
-                json.dump(export_data, f, indent=2, default=str)
+            # Write each section as it is fetched; sessions go out one at a time so the
+            # full history is never held in memory
+            with open(export_path, 'wb') as f:
+                f.write(b'{\n"export_metadata": ' + _dumps(export_metadata))
+                f.write(b',\n"user_profile": ' + _dumps(self.get_user_profile(user_id)))
+                
+                f.write(b',\n"performance_history": [')
+                for index, session_data in enumerate(self.iter_performance_history(user_id, limit=100)):
+                    f.write((b',\n' if index else b'\n') + _dumps(session_data))
+                f.write(b'\n]')
+                
+                f.write(b',\n"learning_insights": ' + _dumps(self.get_learning_insights(user_id)))
+                f.write(b',\n"user_statistics": ' + _dumps(self.get_user_statistics(user_id)))
+                f.write(b'\n}\n')
             
-            print(f"📤 User data exported to: {export_path}")
+            log.info("📤 User data exported to: %s", export_path)
             return str(export_path)
             
         except Exception as e:
-            print(f"❌ Error exporting user data: {e}")
+            log.error("❌ Error exporting user data: %s", e, exc_info=True)
             return ""
     
     def cleanup_old_data(self, days_old: int = 90) -> int:
@@ -667,49 +1081,65 @@ class MemoryBank:
         try:
             cutoff_date = (datetime.now() - timedelta(days=days_old)).isoformat()
             
-            cursor = self.connection.cursor()
+            with self._writing() as writer:
+                cursor = writer.cursor()
             
-            # Delete old performance metrics
-            cursor.execute('''
-                DELETE FROM performance_metrics 
-                WHERE recorded_at < ?
-            ''', (cutoff_date,))
+                # Delete old performance metrics
+                cursor.execute(_SQL_DELETE_OLD_METRICS, (cutoff_date,))
             
-            deleted_metrics = cursor.rowcount
+                deleted_metrics = cursor.rowcount
             
-            # Delete old sessions (but keep user profiles)
-            cursor.execute('''
-                DELETE FROM sessions 
-                WHERE created_at < ? AND status = 'completed'
-            ''', (cutoff_date,))
+                # Delete old sessions (but keep user profiles)
+                cursor.execute(_SQL_DELETE_OLD_SESSIONS, (cutoff_date,))
             
-            deleted_sessions = cursor.rowcount
+                deleted_sessions = cursor.rowcount
+            self._invalidate_profiles()
             
-            self.connection.commit()
+            # Return freed pages to the filesystem and refresh planner statistics.
+            # executescript steps incremental_vacuum to completion; execute() would
+            # stop after the first freed page.
+            with self._write_lock:
+                self._writer.executescript('PRAGMA incremental_vacuum; ANALYZE;')
             
             total_deleted = deleted_metrics + deleted_sessions
-            print(f"🧹 Cleaned up {total_deleted} old records (>{days_old} days)")
+            log.info("🧹 Cleaned up %d old records (>%d days)", total_deleted, days_old)
             
             return total_deleted
             
         except Exception as e:
-            print(f"❌ Error during cleanup: {e}")
+            log.error("❌ Error during cleanup: %s", e, exc_info=True)
             return 0
     
     def close(self) -> None:
-        """Close database connection."""
-        if self.connection:
-            self.connection.close()
-            print("💾 Memory Bank connection closed")
+        """Close database connections."""
+        while not self._readers.empty():
+            reader = self._readers.get_nowait()
+            if reader is not self._writer:
+                reader.close()
+        if self._writer:
+            with self._write_lock:
+                # Refresh query planner statistics gathered during this run
+                self._writer.execute('PRAGMA optimize')
+                self._writer.close()
+            log.info("💾 Memory Bank connection closed")
     
     # Helper methods
     
+    def _invalidate_profiles(self, user_id: Optional[str] = None) -> None:
+        """Drop a cached profile (every cached profile when user_id is None)."""
+        with self._profile_cache_lock:
+            self._profile_generation += 1
+            if user_id is None:
+                self._profile_cache.clear()
+            else:
+                self._profile_cache.pop(user_id, None)
+    
     def _generate_user_id(self, profile_data: Dict[str, Any]) -> str:
         """Generate unique user ID based on profile data."""
         experience = profile_data.get('experience', {})
         field = experience.get('field', 'unknown')
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        return f"user_{field}_{timestamp}"
+        # Random suffix: unique even for profiles created within the same second
+        return f"user_{field}_{uuid.uuid4().hex[:12]}"
     
     def _generate_learning_recommendations(self, insights: Dict[str, Any]) -> List[str]:
         """Generate learning recommendations based on insights."""
@@ -744,4 +1174,10 @@ class MemoryBank:
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit."""
-        self.close()
\ No newline at end of file
+        self.close()
+
+
+@lru_cache(maxsize=1)
+def get_memory_bank() -> MemoryBank:
+    """Return the shared Memory Bank, opening the database on first use."""
+    return MemoryBank()
@@ -0,0 +1,478 @@
+"""
+Semantic Response Cache
+Author: Amin Motiwala
+
+Implements the second (semantic) cache layer for ATIC. User turns are embedded with a
+local MiniLM model and compared against previously answered turns by cosine similarity,
+so paraphrased job descriptions and backgrounds can reuse an earlier Gemini response.
+Entries are scoped to the conversation they answered (prior messages and session
+state), so a short reply is never replayed into a different turn or user's session.
+
+Several worker processes may share one cache: rows are assigned inside a SQLite
+write transaction, the embeddings file only ever grows, and each process picks up
+rows written by the others before it looks anything up. The cache holds at most
+MAX_ENTRIES live entries; expired and evicted rows are purged and their slots reused.
+"""
+
+import asyncio
+import fcntl
+import functools
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+import orjson
+
+try:
+    import numpy as np
+except ImportError:  # Semantic caching is optional
+    np = None
+
+
+MODEL_NAME = 'sentence-transformers/all-MiniLM-L6-v2'
+
+
+@functools.lru_cache(maxsize=1)
+def _get_model():
+    """Load the MiniLM embedding model on first use (None if unavailable)."""
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        print("⚠️ sentence-transformers not installed. Semantic caching will be disabled.")
+        return None
+    return SentenceTransformer(MODEL_NAME)
+
+
+@functools.lru_cache(maxsize=1024)
+def _embed(text: str) -> Optional[Tuple[float, ...]]:
+    """
+    Embed text as an L2-normalized vector.
+
+    Retries and resends of the same turn skip the transformer forward pass. Results
+    are tuples so they stay hashable and immutable inside the cache.
+    """
+    model = _get_model()
+    if model is None:
+        return None
+    return tuple(model.encode(text, normalize_embeddings=True).tolist())
+
+
+def _quantize(vector) -> Tuple[Any, float]:
+    """
+    Quantize a float vector to int8 with a symmetric per-vector scale.
+
+    vector ≈ quantized * scale; MiniLM embeddings keep their ranking at this precision.
+    """
+    peak = float(np.abs(vector).max())
+    scale = peak / 127.0 if peak > 0 else 1.0
+    return np.round(vector / scale).astype(np.int8), scale
+
+
+class SemanticCache:
+    """
+    Embedding-similarity cache layered behind the exact-match LLMCache.
+
+    This class implements:
+    - Local MiniLM embeddings of incoming user turns
+    - Entries scoped to the agent and a digest of the conversation before the turn
+    - Per-agent similarity thresholds
+    - One cosine-similarity matrix-vector product over all stored entries
+    - A memory-mapped int8 embedding matrix (per-row scales) with SQLite metadata
+    - Safe sharing between processes (SQLite-assigned rows, grow-only file lock)
+    - Bounded size: oldest-first eviction past MAX_ENTRIES, reuse of expired rows
+    """
+
+    MODEL_NAME = MODEL_NAME
+    EMBEDDING_DIM = 384
+    DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+    GROWTH_ROWS = 256  # Embedding file grows in chunks to amortize resizing
+    SCORE_BLOCK_ROWS = 4096  # Rows widened to int32 at a time during lookup
+    MAX_ENTRIES = 10000  # Live entries kept; the oldest are evicted beyond this
+    # An evicted row's slot is only reused once every process has had time to see the
+    # eviction, so none can pair the new embedding with the old entry's response
+    REUSE_GRACE_SECONDS = 5 * 60
+
+    # Profile collection tolerates paraphrase; interview/feedback answers must be exact
+    SIMILARITY_THRESHOLDS = {
+        'SessionInitializer': 0.87,
+        'InterviewConductor': 0.95,
+        'FeedbackAnalyzer': 0.95
+    }
+    DEFAULT_THRESHOLD = 0.95
+
+    def __init__(self, db_path: Optional[str] = None,
+                 ttl_seconds: Optional[int] = DEFAULT_TTL_SECONDS):
+        """
+        Initialize the semantic cache.
+
+        Args:
+            db_path: Path to SQLite database file (defaults to the Memory Bank database)
+            ttl_seconds: Lifetime of cached responses (None = never expire)
+        """
+        if db_path is None:
+            # Same file as ATICSettings.DATABASE_PATH / MemoryBank default
+            db_dir = Path(__file__).parent / 'data'
+            db_dir.mkdir(exist_ok=True)
+            db_path = db_dir / 'atic_memory.db'
+
+        self.db_path = db_path
+        # Row i of the matrix holds the embedding of the entry with row_idx i
+        self.embeddings_path = Path(db_path).with_name(f"{Path(db_path).stem}_embeddings.i8")
+        self.ttl_seconds = ttl_seconds
+        self.stats = {'hits': 0, 'misses': 0}
+        self.connection = None
+
+        self.enabled = np is not None
+        if not self.enabled:
+            print("⚠️ numpy not installed. Semantic caching will be disabled.")
+            return
+
+        # Per-row metadata mirrored from SQLite; unused rows can never match
+        self._matrix = None
+        self._count = 0
+        self._synced_seq = 0  # Highest write sequence number read back from SQLite
+        self._scope_ids: Dict[Tuple[str, str], int] = {}
+        self._row_scope = np.empty(0, dtype=np.int32)
+        self._row_scale = np.empty(0, dtype=np.float32)
+        self._row_expires_at = np.empty(0, dtype=np.float64)
+        self._responses: List[Optional[str]] = []
+
+        # SQLite calls run on worker threads; the lock serializes them on the connection
+        self._db_lock = threading.Lock()
+        self.connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        columns = [row[1] for row in self.connection.execute('PRAGMA table_info(semantic_cache_entries)')]
+        if columns and not {'scale', 'context_digest', 'seq'} <= set(columns):
+            # Entries from the float32 layout have no usable int8 rows, unscoped entries
+            # cannot be matched to a conversation, and unsequenced rows cannot be synced
+            # between processes; start the cache over
+            self.connection.execute('DROP TABLE semantic_cache_entries')
+        self.connection.execute('''
+            CREATE TABLE IF NOT EXISTS semantic_cache_entries (
+                row_idx INTEGER PRIMARY KEY,  -- Row in the embeddings matrix file
+                seq INTEGER NOT NULL,  -- Write sequence number; bumped on every change
+                scale REAL NOT NULL,  -- Dequantization scale of the int8 row
+                agent_name TEXT NOT NULL,
+                context_digest TEXT NOT NULL,  -- SemanticCache.context_digest of the turn
+                created_at TEXT NOT NULL,
+                expires_at REAL,  -- Unix timestamp, NULL = never expires
+                response_text TEXT NOT NULL
+            )
+        ''')
+        self.connection.execute(
+            'CREATE INDEX IF NOT EXISTS idx_semantic_cache_seq ON semantic_cache_entries(seq)'
+        )
+        self.connection.execute(
+            'CREATE INDEX IF NOT EXISTS idx_semantic_cache_expires ON semantic_cache_entries(expires_at)'
+        )
+        self.connection.commit()
+        self._embeddings_fd = os.open(self.embeddings_path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._load_entries()
+
+    @staticmethod
+    def context_digest(messages: List[Any], state: Dict[str, Any]) -> str:
+        """
+        Digest the conversation a user turn arrives in.
+
+        Args:
+            messages: JSON-serializable messages that precede the turn
+            state: Session state values the agent's instruction reads
+
+        Returns:
+            str: Hex digest; only turns with the same digest can share a response
+        """
+        payload = orjson.dumps({'messages': messages, 'state': state},
+                               option=orjson.OPT_SORT_KEYS, default=str)
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+    async def lookup(self, agent_name: str, context_digest: str, text: str) -> Optional[str]:
+        """
+        Find a cached response for a semantically similar user turn.
+
+        Args:
+            agent_name: Sub-agent the response belongs to
+            context_digest: context_digest() of the conversation before the turn
+            text: Incoming user turn
+
+        Returns:
+            Cached response text, or None if nothing is similar enough
+        """
+        if not self.enabled or not text.strip():
+            self.stats['misses'] += 1
+            return None
+
+        rows, query = await asyncio.to_thread(self._sync_and_embed, agent_name, context_digest, text)
+        self._apply_rows(rows)
+        scope_id = self._scope_ids.get((agent_name, context_digest))
+        if scope_id is None or query is None:
+            self.stats['misses'] += 1
+            return None
+
+        # Rows are L2-normalized before quantization, so the dequantized dot product
+        # is the cosine similarity
+        count = self._count
+        query_q, query_scale = _quantize(query)
+        query_q = query_q.astype(np.int32)
+        raw = np.empty(count, dtype=np.int32)
+        for start in range(0, count, self.SCORE_BLOCK_ROWS):
+            stop = min(start + self.SCORE_BLOCK_ROWS, count)
+            # numpy has no int8 GEMV with int32 accumulation, so widen one block at a time
+            raw[start:stop] = self._matrix[start:stop].astype(np.int32) @ query_q
+        scores = raw.astype(np.float32) * (self._row_scale[:count] * query_scale)
+        valid = (self._row_scope[:count] == scope_id) & (self._row_expires_at[:count] >= time.time())
+        scores = np.where(valid, scores, -1.0)
+        best = int(scores.argmax())
+
+        if scores[best] >= self.SIMILARITY_THRESHOLDS.get(agent_name, self.DEFAULT_THRESHOLD):
+            self.stats['hits'] += 1
+            return self._responses[best]
+
+        self.stats['misses'] += 1
+        return None
+
+    async def store(self, agent_name: str, context_digest: str, text: str, response_text: str) -> None:
+        """
+        Cache a response for a user turn.
+
+        Args:
+            agent_name: Sub-agent that produced the response
+            context_digest: context_digest() of the conversation before the turn
+            text: User turn that was answered
+            response_text: Model response to reuse
+        """
+        if not self.enabled or not text.strip():
+            return
+
+        embedding = await asyncio.to_thread(self._embed_query, text)
+        if embedding is None:
+            return
+
+        expires_at = time.time() + self.ttl_seconds if self.ttl_seconds else None
+        quantized, scale = _quantize(embedding)
+
+        row_idx = await asyncio.to_thread(self._insert_row, quantized, scale, agent_name,
+                                          context_digest, expires_at, response_text)
+        self._apply_rows([(row_idx, scale, agent_name, context_digest, expires_at, response_text, None)])
+
+    # Helper methods
+
+    def _load_entries(self) -> None:
+        """Map the embeddings file and load row metadata from SQLite."""
+        with self._db_lock:
+            # Inside the write transaction no other process can be adding a row mid-check
+            self.connection.execute('BEGIN IMMEDIATE')
+            try:
+                capacity = self._grow_file(0)
+                # Rows without a complete embedding (file missing or truncated) are unusable,
+                # and rows expired past the grace period are purged so their slots free up
+                self.connection.execute('''
+                    DELETE FROM semantic_cache_entries WHERE row_idx >= ? OR expires_at < ?
+                ''', (capacity, time.time() - self.REUSE_GRACE_SECONDS))
+                rows = self._select_rows_after(0)
+                self.connection.commit()
+            except BaseException:
+                self.connection.rollback()
+                raise
+
+        self._ensure_capacity(max(capacity, 1))
+        self._apply_rows(rows)
+        self._synced_seq = rows[-1][-1] if rows else 0
+
+    def _select_rows_after(self, seq: int) -> List[Tuple]:
+        """Metadata rows written after sequence number seq, in write order (caller holds _db_lock)."""
+        return self.connection.execute('''
+            SELECT row_idx, scale, agent_name, context_digest, expires_at, response_text, seq
+            FROM semantic_cache_entries
+            WHERE seq > ?
+            ORDER BY seq ASC
+        ''', (seq,)).fetchall()
+
+    def _sync_and_embed(self, agent_name: str, context_digest: str, text: str) -> Tuple[List[Tuple], Any]:
+        """
+        Fetch rows other processes added since the last sync, then embed text if the
+        scope has any entries (blocking; runs on a worker thread).
+        """
+        with self._db_lock:
+            rows = self._select_rows_after(self._synced_seq)
+            if rows:
+                self._synced_seq = rows[-1][-1]
+
+        scope = (agent_name, context_digest)
+        if scope not in self._scope_ids and not any((row[2], row[3]) == scope for row in rows):
+            return rows, None
+        return rows, self._embed_query(text)
+
+    def _insert_row(self, quantized, scale: float, agent_name: str, context_digest: str,
+                    expires_at: Optional[float], response_text: str) -> int:
+        """
+        Add an entry and return the row_idx it was given (blocking; runs on a worker thread).
+
+        The write transaction serializes every process's inserts, so no two entries share
+        a row, and the embedding reaches the file before the metadata commits. The entry
+        takes a long-expired row if there is one, else the lowest free row; live entries
+        past MAX_ENTRIES are then evicted oldest first.
+        """
+        with self._db_lock:
+            self.connection.execute('BEGIN IMMEDIATE')
+            try:
+                now = time.time()
+                row_idx = self._free_row(now)
+                (seq,) = self.connection.execute(
+                    'SELECT COALESCE(MAX(seq), 0) + 1 FROM semantic_cache_entries'
+                ).fetchone()
+
+                self._grow_file(row_idx + 1)
+                os.pwrite(self._embeddings_fd, quantized.tobytes(), row_idx * self.EMBEDDING_DIM)
+                self.connection.execute('''
+                    INSERT OR REPLACE INTO semantic_cache_entries
+                    (row_idx, seq, scale, agent_name, context_digest, created_at, expires_at, response_text)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (row_idx, seq, scale, agent_name, context_digest, datetime.now().isoformat(),
+                      expires_at, response_text))
+                self._evict_excess(now, seq)
+                self.connection.commit()
+            except BaseException:
+                self.connection.rollback()
+                raise
+        return row_idx
+
+    def _free_row(self, now: float) -> int:
+        """Row for a new entry: one expired past the grace period, else the lowest unused one."""
+        row = self.connection.execute('''
+            SELECT row_idx FROM semantic_cache_entries
+            WHERE expires_at < ?
+            ORDER BY expires_at ASC
+            LIMIT 1
+        ''', (now - self.REUSE_GRACE_SECONDS,)).fetchone()
+        if row is not None:
+            return row[0]
+
+        (row_idx,) = self.connection.execute('''
+            SELECT CASE
+                WHEN NOT EXISTS (SELECT 1 FROM semantic_cache_entries WHERE row_idx = 0) THEN 0
+                ELSE (SELECT MIN(used.row_idx) + 1 FROM semantic_cache_entries AS used
+                      WHERE NOT EXISTS (SELECT 1 FROM semantic_cache_entries AS other
+                                        WHERE other.row_idx = used.row_idx + 1))
+            END
+        ''').fetchone()
+        return row_idx
+
+    def _evict_excess(self, now: float, seq: int) -> None:
+        """
+        Expire the oldest live entries beyond MAX_ENTRIES (caller holds the write transaction).
+
+        Evicted rows are marked expired rather than overwritten, and get a new sequence
+        number so every process's next sync masks them.
+        """
+        (live,) = self.connection.execute(
+            'SELECT COUNT(*) FROM semantic_cache_entries WHERE expires_at IS NULL OR expires_at >= ?',
+            (now,)
+        ).fetchone()
+        if live <= self.MAX_ENTRIES:
+            return
+
+        victims = self.connection.execute('''
+            SELECT row_idx FROM semantic_cache_entries
+            WHERE expires_at IS NULL OR expires_at >= ?
+            ORDER BY seq ASC
+            LIMIT ?
+        ''', (now, live - self.MAX_ENTRIES)).fetchall()
+        self.connection.executemany(
+            "UPDATE semantic_cache_entries SET expires_at = ?, seq = ?, response_text = '' WHERE row_idx = ?",
+            [(now, seq + offset, row_idx) for offset, (row_idx,) in enumerate(victims, start=1)]
+        )
+
+    def _grow_file(self, rows: int) -> int:
+        """
+        Make the embeddings file hold at least rows rows and return how many it holds.
+
+        The file only ever grows, under an exclusive lock, so a process can never cut off
+        rows another process has mapped. Extending it zero-fills the new rows.
+        """
+        with open(self.embeddings_path, 'ab') as embeddings_file:
+            fcntl.flock(embeddings_file, fcntl.LOCK_EX)
+            size = os.fstat(embeddings_file.fileno()).st_size
+            needed = -(-rows // self.GROWTH_ROWS) * self.GROWTH_ROWS * self.EMBEDDING_DIM
+            if size < needed:
+                embeddings_file.truncate(needed)
+                size = needed
+        return size // self.EMBEDDING_DIM
+
+    def _ensure_capacity(self, rows: int) -> None:
+        """Map at least rows rows of the embeddings file and size the row metadata to match."""
+        capacity = len(self._row_scope)
+        if rows <= capacity:
+            return
+
+        # Rows are written with pwrite, so the map is read-only; it is reopened at the new size
+        new_capacity = self._grow_file(rows)
+        self._matrix = np.memmap(self.embeddings_path, dtype=np.int8, mode='r',
+                                 shape=(new_capacity, self.EMBEDDING_DIM))
+
+        grow = new_capacity - capacity
+        self._row_scope = np.append(self._row_scope, np.full(grow, -1, dtype=np.int32))
+        self._row_scale = np.append(self._row_scale, np.zeros(grow, dtype=np.float32))
+        self._row_expires_at = np.append(self._row_expires_at, np.full(grow, -np.inf))
+        self._responses.extend([None] * grow)
+
+    def _apply_rows(self, rows: List[Tuple]) -> None:
+        """Record metadata rows read from (or just written to) SQLite."""
+        if not rows:
+            return
+        last_row = max(row[0] for row in rows)
+        self._ensure_capacity(last_row + 1)
+        for row_idx, scale, agent_name, context_digest, expires_at, response_text, _ in rows:
+            self._set_row(row_idx, scale, agent_name, context_digest, response_text, expires_at)
+        self._count = max(self._count, last_row + 1)
+
+    def _set_row(self, row_idx: int, scale: float, agent_name: str, context_digest: str,
+                 response_text: str, expires_at: Optional[float]) -> None:
+        """Record the metadata for an embedding row."""
+        scope = (agent_name, context_digest)
+        self._row_scope[row_idx] = self._scope_ids.setdefault(scope, len(self._scope_ids))
+        self._row_scale[row_idx] = scale
+        self._row_expires_at[row_idx] = np.inf if expires_at is None else expires_at
+        # Expired and evicted rows can never match, so their text is not kept in memory
+        live = expires_at is None or expires_at >= time.time()
+        self._responses[row_idx] = response_text if live else None
+
+    def _embed_query(self, text: str):
+        """Embed text as a float32 vector (None if the model is unavailable)."""
+        vector = _embed(text)
+        if vector is None:
+            self.enabled = False
+            return None
+        return np.asarray(vector, dtype=np.float32)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for the response and embedding caches."""
+        embedding_info = _embed.cache_info()
+        entries = int((self._row_scope[:self._count] >= 0).sum()) if self.enabled else 0
+        return {
+            'responses': dict(self.stats),
+            'entries': entries,
+            'embeddings': {
+                'hits': embedding_info.hits,
+                'misses': embedding_info.misses,
+                'size': embedding_info.currsize,
+                'max_size': embedding_info.maxsize
+            }
+        }
+
+    def close(self) -> None:
+        """Unmap the embeddings file and close database connection."""
+        if self.enabled and self._matrix is not None:
+            self._matrix = None
+            os.close(self._embeddings_fd)
+        if self.connection:
+            self.connection.close()
+
+
+@functools.lru_cache(maxsize=1)
+def get_semantic_cache() -> SemanticCache:
+    """Return the shared semantic cache, loading stored embeddings on first use."""
+    return SemanticCache()
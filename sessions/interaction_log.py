@@ -0,0 +1,76 @@
+"""
+Agent Interaction Log
+Author: Amin Motiwala
+
+Column-oriented log of the agent interactions recorded during an ATIC session. Each
+field of an interaction is kept in its own column, with agent names and interaction
+types interned to small integers, instead of one dict per interaction.
+"""
+
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Any, List
+
+
+@dataclass(slots=True)
+class InteractionLog:
+    """
+    Structure-of-arrays interaction log.
+
+    Row i of the log is (timestamps_ns[i], agents[agent_ids[i]],
+    interaction_types[type_ids[i]], data[i]).
+    """
+
+    timestamps_ns: array = field(default_factory=lambda: array('q'))
+    agent_ids: array = field(default_factory=lambda: array('H'))
+    type_ids: array = field(default_factory=lambda: array('H'))
+    data: List[Dict[str, Any]] = field(default_factory=list)
+    # Intern tables; a session only ever involves a handful of agents and types
+    agents: List[str] = field(default_factory=list)
+    interaction_types: List[str] = field(default_factory=list)
+
+    def append(self, timestamp_ns: int, agent_name: str, interaction_type: str,
+               interaction_data: Dict[str, Any]) -> None:
+        """Record one interaction."""
+        self.timestamps_ns.append(timestamp_ns)
+        self.agent_ids.append(self._intern(self.agents, agent_name))
+        self.type_ids.append(self._intern(self.interaction_types, interaction_type))
+        self.data.append(interaction_data)
+
+    def records(self) -> List[Dict[str, Any]]:
+        """Return the interactions as one dict per row, with ISO timestamps."""
+        return [
+            {
+                'timestamp': datetime.fromtimestamp(timestamp_ns / 1e9).isoformat(),
+                'agent': self.agents[agent_id],
+                'interaction_type': self.interaction_types[type_id],
+                'data': interaction_data
+            }
+            for timestamp_ns, agent_id, type_id, interaction_data
+            in zip(self.timestamps_ns, self.agent_ids, self.type_ids, self.data)
+        ]
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, Any]) -> "InteractionLog":
+        """Rebuild a log from its serialized columns (plain lists)."""
+        return cls(
+            timestamps_ns=array('q', columns.get('timestamps_ns', [])),
+            agent_ids=array('H', columns.get('agent_ids', [])),
+            type_ids=array('H', columns.get('type_ids', [])),
+            data=list(columns.get('data', [])),
+            agents=list(columns.get('agents', [])),
+            interaction_types=list(columns.get('interaction_types', []))
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamps_ns)
+
+    @staticmethod
+    def _intern(table: List[str], value: str) -> int:
+        """Return the index of value in table, adding it on first use."""
+        try:
+            return table.index(value)
+        except ValueError:
+            table.append(value)
+            return len(table) - 1
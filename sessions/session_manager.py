@@ -6,11 +6,159 @@ Manages the complete session lifecycle including initialization, context gatheri
 and coordination between agents in the sequential workflow.
 """
 
-import uuid
+import secrets
+import sys
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, Iterable, List, Mapping, Optional, Tuple
 import json
 
+try:
+    import ahocorasick
+except ImportError:  # Keyword extraction falls back to per-keyword substring scans
+    ahocorasick = None
+
+from memory.memory_bank import get_memory_bank
+from sessions.interaction_log import InteractionLog
+from sessions.session_store import SessionStore, get_session_store
+
+
+@dataclass(slots=True)
+class SessionPhase:
+    """One phase of an interview plan's session structure (stored via asdict)."""
+
+    phase: str
+    duration_minutes: int
+    question_count: int
+    difficulty: str
+
+
+# Keyword tables for job description analysis (substring matches on the lowercased JD)
+TECHNICAL_KEYWORDS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    'programming_languages': ('python', 'javascript', 'java', 'c++', 'c#', 'go', 'rust', 'typescript', 'php', 'ruby'),
+    'frameworks': ('react', 'angular', 'vue', 'django', 'flask', 'spring', 'express', 'laravel', 'rails'),
+    'databases': ('sql', 'mysql', 'postgresql', 'mongodb', 'redis', 'elasticsearch', 'dynamodb'),
+    'cloud_platforms': ('aws', 'azure', 'gcp', 'google cloud', 'docker', 'kubernetes', 'terraform'),
+    'tools': ('git', 'jenkins', 'ci/cd', 'microservices', 'api', 'rest', 'graphql')
+})
+
+SENIORITY_INDICATORS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    'senior': ('senior', 'lead', 'principal', 'architect', '5+ years', 'mentor', 'leadership'),
+    'mid': ('mid-level', '3-5 years', 'experienced', 'solid experience'),
+    'junior': ('junior', 'entry-level', '0-2 years', 'new graduate', 'recent graduate')
+})
+
+RESPONSIBILITY_KEYWORDS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    'system_design': ('system design', 'architecture', 'scalable', 'distributed', 'microservices'),
+    'coding': ('coding', 'programming', 'development', 'implementation', 'algorithms'),
+    'collaboration': ('collaborate', 'team', 'cross-functional', 'communication'),
+    'leadership': ('mentor', 'lead', 'guide', 'technical leadership')
+})
+
+# Self-assessment skill areas per technical field
+FIELD_SKILLS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    'front-end': ('JavaScript/TypeScript', 'React/Vue/Angular', 'CSS/Styling', 'Web Performance', 'Testing'),
+    'back-end': ('System Design', 'Database Design', 'API Development', 'Scalability', 'Security'),
+    'full-stack': ('Frontend Development', 'Backend Development', 'Database Design', 'System Architecture', 'DevOps'),
+    'data science': ('Machine Learning', 'Statistics', 'Python/R', 'Data Processing', 'Visualization'),
+    'devops': ('Infrastructure', 'CI/CD', 'Monitoring', 'Cloud Platforms', 'Automation'),
+    'mobile': ('iOS/Android Development', 'Mobile UI/UX', 'Performance', 'Testing', 'App Store'),
+    'qa': ('Test Automation', 'Manual Testing', 'Performance Testing', 'Security Testing', 'Tools')
+})
+DEFAULT_SKILL_AREAS = ('Problem Solving', 'Algorithms', 'Data Structures', 'System Design', 'Communication')
+
+SENIORITY_RANKS: Mapping[str, int] = MappingProxyType({'junior': 1, 'mid': 2, 'senior': 3})
+
+# Experience levels by years: up to 2 is junior, up to 5 is mid, above is senior
+EXPERIENCE_LEVELS = ('junior', 'mid', 'senior')
+EXPERIENCE_LEVEL_MAX_YEARS = (2, 5)
+
+# Question categories drawn for each interview focus area
+FOCUS_QUESTION_CATEGORIES: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    'coding_problems': ('algorithms', 'data_structures', 'problem_solving'),
+    'system_design': ('scalability', 'architecture', 'trade_offs'),
+    'technical_knowledge': ('concepts', 'best_practices', 'tools'),
+    'behavioral_leadership': ('leadership', 'teamwork', 'communication'),
+    'general_technical': ('algorithms', 'concepts', 'problem_solving')
+})
+
+KEYWORD_GROUPS: Mapping[str, Mapping[str, Tuple[str, ...]]] = MappingProxyType({
+    'technical': TECHNICAL_KEYWORDS,
+    'seniority': SENIORITY_INDICATORS,
+    'responsibility': RESPONSIBILITY_KEYWORDS
+})
+
+
+def _build_keyword_index() -> Dict[str, Tuple[Tuple[str, int, str], ...]]:
+    """
+    Invert the keyword tables: keyword -> (group, rank, category) for every table row
+    listing it. rank is the keyword's position in its group's table order, so sorting
+    matches by rank reproduces a walk over the tables.
+    """
+    index: Dict[str, List[Tuple[str, int, str]]] = {}
+    for group, table in KEYWORD_GROUPS.items():
+        rank = 0
+        for category, keywords in table.items():
+            for keyword in keywords:
+                index.setdefault(keyword, []).append((group, rank, category))
+                rank += 1
+    return {keyword: tuple(entries) for keyword, entries in index.items()}
+
+
+_KEYWORD_INDEX = _build_keyword_index()
+
+# Every distinct keyword, scanned once per job description
+_ALL_KEYWORDS = tuple(_KEYWORD_INDEX)
+
+# UTF-8 is self-synchronizing, so a keyword occurs in the encoded JD exactly when it
+# occurs in the str; bytes search stays on one-byte units whatever the JD's widest char
+_ALL_KEYWORD_BYTES = tuple((keyword.encode('utf-8'), keyword) for keyword in _ALL_KEYWORDS)
+
+
+def _build_keyword_automaton():
+    """Build the Aho-Corasick automaton over all keywords (None if unavailable)."""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for keyword in _ALL_KEYWORDS:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton()
+
+
+def _find_keywords(text: str) -> frozenset:
+    """
+    Return every keyword occurring in text as a substring.
+    
+    Aho-Corasick reports overlapping matches (e.g. 'java' inside 'javascript') in one
+    linear pass, so the result is the same as testing each keyword with `in`.
+    """
+    if _KEYWORD_AUTOMATON is None:
+        text_bytes = text.encode('utf-8')
+        return frozenset(keyword for keyword_bytes, keyword in _ALL_KEYWORD_BYTES if keyword_bytes in text_bytes)
+    return frozenset(keyword for _, keyword in _KEYWORD_AUTOMATON.iter(text))
+
+
+@lru_cache(maxsize=32)
+def _question_categories_for(focus_areas: Tuple[str, ...]) -> Tuple[str, ...]:
+    """
+    Question categories for a sequence of focus areas, without duplicates.
+    
+    Keyed on the ordered tuple (not a frozenset) so the category order is deterministic.
+    """
+    return tuple(dict.fromkeys(
+        category
+        for focus in focus_areas
+        for category in FOCUS_QUESTION_CATEGORIES.get(focus, ('general',))
+    ))
+
 
 class SessionManager:
     """
@@ -24,10 +172,25 @@ class SessionManager:
     - Session persistence and recovery
     """
     
-    def __init__(self, memory_bank):
+    # Finished sessions kept in-process; the Memory Bank holds the full history
+    SESSION_HISTORY_LIMIT = 256
+    
+    # Step 3/4 analysis summaries; turn off when building sessions non-interactively
+    verbose = True
+    
+    def __init__(self, memory_bank, session_store: Optional[SessionStore] = None,
+                 max_history: int = SESSION_HISTORY_LIMIT):
         self.memory_bank = memory_bank
-        self.active_sessions = {}
-        self.session_history = []
+        # Active sessions live in the store so other workers can serve them too
+        self.session_store = session_store if session_store is not None else get_session_store()
+        # finalize_session persists every session before it enters the history, so
+        # entries evicted from the deque are already archived in the Memory Bank
+        self.max_history = max_history
+        self.session_history = deque(maxlen=max_history)
+        # Piped stdin (scripted runs, CI replays) is read once on the first prompt and
+        # served line by line, without writing or flushing prompts
+        self._interactive = sys.stdin is None or sys.stdin.isatty()
+        self._stdin_lines: Optional[deque] = None
     
     def initialize_session(self) -> str:
         """
@@ -56,7 +219,7 @@ class SessionManager:
             'user_profile': {},
             'context_data': {},
             'interview_plan': {},
-            'agent_interactions': []
+            'agent_interactions': InteractionLog()
         }
         
         try:
@@ -89,8 +252,8 @@ class SessionManager:
             )
             
             # Store session in active sessions and memory bank
-            self.active_sessions[session_id] = session_data
-            self.memory_bank.store_session_initialization(session_data)
+            self.session_store.put(session_id, session_data)
+            self.memory_bank.store_session_initialization(self._session_snapshot(session_data))
             
             print("\n✅ Session initialization complete!")
             print(f"📊 Your profile: {experience_data['field']} developer with {experience_data['years']} years experience")
@@ -104,7 +267,7 @@ class SessionManager:
             print(f"❌ Session initialization failed: {str(e)}")
             session_data['status'] = 'failed'
             session_data['error'] = str(e)
-            self.active_sessions[session_id] = session_data
+            self.session_store.put(session_id, session_data)
             return session_id
     
     def _gather_experience_assessment(self) -> Dict[str, Any]:
@@ -120,22 +283,18 @@ class SessionManager:
         """
         print("Please provide information about your professional background:")
         
-        # Core experience information
-        while True:
-            try:
-                years_input = input("💼 Years of professional experience: ")
-                years_experience = int(years_input) if years_input.isdigit() else 0
-                break
-            except ValueError:
-                print("Please enter a valid number.")
+        # Core experience information (isdecimal() accepts exactly what int() parses;
+        # isdigit() would also pass superscripts such as '²')
+        years_input = self._input("💼 Years of professional experience: ").strip()
+        years_experience = int(years_input) if years_input.isdecimal() else 0
         
-        technical_field = input("🔧 Primary technical field (e.g., front-end, back-end, data science, DevOps, full-stack): ").strip().lower()
-        current_role = input("👔 Current job title: ").strip()
+        technical_field = self._input("🔧 Primary technical field (e.g., front-end, back-end, data science, DevOps, full-stack): ").strip().lower()
+        current_role = self._input("👔 Current job title: ").strip()
         
         # Additional context
         print("\nOptional additional context:")
-        company_size = input("🏢 Current company size (startup/mid-size/enterprise) [Optional]: ").strip()
-        previous_interviews = input("📊 Recent technical interviews attempted (number) [Optional]: ").strip()
+        company_size = self._input("🏢 Current company size (startup/mid-size/enterprise) [Optional]: ").strip()
+        previous_interviews = self._input("📊 Recent technical interviews attempted (number) [Optional]: ").strip()
         
         # Self-assessment of technical areas
         print("\n📋 Quick self-assessment (1-5 scale, 5 being expert):")
@@ -143,22 +302,10 @@ class SessionManager:
         
         skill_areas = self._get_skill_areas_for_field(technical_field)
         for skill in skill_areas[:5]:  # Limit to top 5 relevant skills
-            while True:
-                try:
-                    score_input = input(f"   {skill} (1-5): ")
-                    if score_input.strip() == "":
-                        score = 3  # Default to intermediate
-                    else:
-                        score = int(score_input)
-                        if 1 <= score <= 5:
-                            break
-                        else:
-                            print("Please enter a number between 1 and 5.")
-                            continue
-                    self_assessment[skill] = score
-                    break
-                except ValueError:
-                    print("Please enter a valid number.")
+            score_input = self._input(f"   {skill} (1-5): ").strip()
+            # Blank or non-numeric answers default to intermediate; others clamp to 1-5
+            score = int(score_input) if score_input.isdecimal() else 3
+            self_assessment[skill] = max(1, min(5, score))
         
         return {
             'years': years_experience,
@@ -167,7 +314,7 @@ class SessionManager:
             'company_size': company_size,
             'previous_interviews': previous_interviews,
             'self_assessment': self_assessment,
-            'proficiency_areas': skill_areas,
+            'proficiency_areas': list(skill_areas),  # Session data holds lists, not the shared tuple
             'experience_level': self._categorize_experience_level(years_experience)
         }
     
@@ -183,9 +330,9 @@ class SessionManager:
         """
         print("Please provide details about your target position:")
         
-        target_company = input("🏢 Company name: ").strip()
-        target_role = input("💼 Job title: ").strip()
-        interview_timeline = input("📅 Expected interview timeline (e.g., '2 weeks', 'next month') [Optional]: ").strip()
+        target_company = self._input("🏢 Company name: ").strip()
+        target_role = self._input("💼 Job title: ").strip()
+        interview_timeline = self._input("📅 Expected interview timeline (e.g., '2 weeks', 'next month') [Optional]: ").strip()
         
         print("\n📄 Job Description Analysis:")
         print("Please paste the complete job description below.")
@@ -195,9 +342,12 @@ class SessionManager:
         job_description_lines = []
         consecutive_empty = 0
         
-        while True:
-            line = input()
-            
+        # Read the paste line by line without input()'s per-line stdout/stderr flushes;
+        # answers after the paste stay queued for the next prompts, and EOF ends the
+        # paste like 'DONE'
+        if self._interactive:
+            sys.stdout.flush()
+        while (line := self._read_line()) is not None:
             if line.strip().upper() == 'DONE':
                 break
                 
@@ -236,96 +386,103 @@ class SessionManager:
         - Interview focus areas
         - Technology stack
         """
-        print("Analyzing job description for key requirements...")
-        
-        # Initialize extraction results
-        extraction_results = {
-            'required_technical_skills': [],
-            'preferred_skills': [],
-            'seniority_indicators': [],
-            'responsibility_categories': [],
-            'technology_stack': [],
-            'soft_skills': [],
-            'interview_focus_areas': [],
-            'complexity_level': 'intermediate'
-        }
+        if self.verbose:
+            print("Analyzing job description for key requirements...")
         
         if not job_description.strip():
             return self._get_default_extraction_template()
         
+        extraction_results, detected_seniority = self._extract_job_requirements(job_description)
+        
+        if not self.verbose:
+            return extraction_results
+        
+        print(f"✅ Extracted {len(extraction_results['technology_stack'])} technical skills")
+        print(f"📊 Detected seniority level: {detected_seniority}")
+        print(f"🎯 Interview focus areas: {', '.join(extraction_results['interview_focus_areas'])}")
+        
+        return extraction_results
+    
+    def analyze_job_descriptions(self, job_descriptions: Iterable[str]) -> List[Dict[str, Any]]:
+        """
+        Run Step 3 extraction over many job descriptions (e.g. replaying stored JDs).
+        
+        Uses the same keyword scan as a live session without its console output.
+        
+        Args:
+            job_descriptions: Job description texts
+            
+        Returns:
+            Extraction results per job description, in order
+        """
+        return [
+            self._extract_job_requirements(job_description)[0] if job_description.strip()
+            else self._get_default_extraction_template()
+            for job_description in job_descriptions
+        ]
+    
+    def _extract_job_requirements(self, job_description: str) -> Tuple[Dict[str, Any], str]:
+        """Extract requirements from a non-empty JD; returns (results, detected seniority)."""
         # Convert to lowercase for analysis
         jd_lower = job_description.lower()
         
-        # Extract technical skills using keyword matching
-        technical_keywords = {
-            'programming_languages': ['python', 'javascript', 'java', 'c++', 'c#', 'go', 'rust', 'typescript', 'php', 'ruby'],
-            'frameworks': ['react', 'angular', 'vue', 'django', 'flask', 'spring', 'express', 'laravel', 'rails'],
-            'databases': ['sql', 'mysql', 'postgresql', 'mongodb', 'redis', 'elasticsearch', 'dynamodb'],
-            'cloud_platforms': ['aws', 'azure', 'gcp', 'google cloud', 'docker', 'kubernetes', 'terraform'],
-            'tools': ['git', 'jenkins', 'ci/cd', 'microservices', 'api', 'rest', 'graphql']
-        }
+        # One scan over the JD finds every keyword; the inverted index files each match
+        # under its groups, in table order
+        matches: Dict[str, List[Tuple[int, str, str]]] = {group: [] for group in KEYWORD_GROUPS}
+        for keyword in _find_keywords(jd_lower):
+            for group, rank, category in _KEYWORD_INDEX[keyword]:
+                matches[group].append((rank, category, keyword))
+        for group_matches in matches.values():
+            group_matches.sort()
         
-        for category, keywords in technical_keywords.items():
-            found_skills = [skill for skill in keywords if skill in jd_lower]
-            extraction_results['technology_stack'].extend(found_skills)
-        
-        # Determine seniority level
-        seniority_indicators = {
-            'senior': ['senior', 'lead', 'principal', 'architect', '5+ years', 'mentor', 'leadership'],
-            'mid': ['mid-level', '3-5 years', 'experienced', 'solid experience'],
-            'junior': ['junior', 'entry-level', '0-2 years', 'new graduate', 'recent graduate']
-        }
+        # Extract technical skills (one list; required/preferred are split from it below)
+        technology_stack = [skill for _, _, skill in matches['technical']]
         
+        # Determine seniority level: the first level in table order with any indicator
         detected_seniority = 'mid'  # default
-        for level, indicators in seniority_indicators.items():
-            if any(indicator in jd_lower for indicator in indicators):
-                detected_seniority = level
-                extraction_results['seniority_indicators'].extend(
-                    [indicator for indicator in indicators if indicator in jd_lower]
-                )
-                break
+        seniority_indicators = []
+        if matches['seniority']:
+            detected_seniority = matches['seniority'][0][1]
+            seniority_indicators = [
+                indicator for _, level, indicator in matches['seniority'] if level == detected_seniority
+            ]
         
         # Extract responsibility categories
-        responsibility_keywords = {
-            'system_design': ['system design', 'architecture', 'scalable', 'distributed', 'microservices'],
-            'coding': ['coding', 'programming', 'development', 'implementation', 'algorithms'],
-            'collaboration': ['collaborate', 'team', 'cross-functional', 'communication'],
-            'leadership': ['mentor', 'lead', 'guide', 'technical leadership']
-        }
-        
-        for category, keywords in responsibility_keywords.items():
-            if any(keyword in jd_lower for keyword in keywords):
-                extraction_results['responsibility_categories'].append(category)
+        responsibility_categories = list(dict.fromkeys(
+            category for _, category, _ in matches['responsibility']
+        ))
         
         # Determine interview focus areas based on extracted data
         focus_areas = []
-        if extraction_results['technology_stack']:
+        if technology_stack:
             focus_areas.append('technical_knowledge')
-        if 'coding' in extraction_results['responsibility_categories']:
+        if 'coding' in responsibility_categories:
             focus_areas.append('coding_problems')
-        if 'system_design' in extraction_results['responsibility_categories']:
+        if 'system_design' in responsibility_categories:
             focus_areas.append('system_design')
-        if 'leadership' in extraction_results['responsibility_categories']:
+        if 'leadership' in responsibility_categories:
             focus_areas.append('behavioral_leadership')
         
-        extraction_results['interview_focus_areas'] = focus_areas or ['general_technical']
-        
         # Set complexity level based on seniority and responsibilities
-        if detected_seniority == 'senior' or len(extraction_results['responsibility_categories']) > 3:
-            extraction_results['complexity_level'] = 'advanced'
+        complexity_level = 'intermediate'
+        if detected_seniority == 'senior' or len(responsibility_categories) > 3:
+            complexity_level = 'advanced'
         elif detected_seniority == 'junior':
-            extraction_results['complexity_level'] = 'beginner'
-        
-        # Separate required vs preferred skills (simplified heuristic)
-        all_skills = extraction_results['technology_stack']
-        extraction_results['required_technical_skills'] = all_skills[:6]  # First 6 as required
-        extraction_results['preferred_skills'] = all_skills[6:]  # Rest as preferred
+            complexity_level = 'beginner'
         
-        print(f"✅ Extracted {len(all_skills)} technical skills")
-        print(f"📊 Detected seniority level: {detected_seniority}")
-        print(f"🎯 Interview focus areas: {', '.join(focus_areas)}")
+        # Results are assembled once; required vs preferred is a simplified heuristic
+        extraction_results = {
+            'required_technical_skills': technology_stack[:6],  # First 6 as required
+            'preferred_skills': technology_stack[6:],  # Rest as preferred
+            'seniority_indicators': seniority_indicators,
+            'responsibility_categories': responsibility_categories,
+            'technology_stack': technology_stack,
+            'soft_skills': [],
+            'interview_focus_areas': focus_areas or ['general_technical'],
+            'complexity_level': complexity_level
+        }
         
-        return extraction_results
+        return extraction_results, detected_seniority
     
     def _create_adaptive_interview_plan(self, experience_data: Dict, job_data: Dict, extracted_skills: Dict) -> Dict[str, Any]:
         """
@@ -337,7 +494,8 @@ class SessionManager:
         - Interview focus areas from JD analysis
         - Adaptive difficulty progression
         """
-        print("Creating your personalized interview plan...")
+        if self.verbose:
+            print("Creating your personalized interview plan...")
         
         interview_plan = {
             'session_structure': {},
@@ -353,43 +511,30 @@ class SessionManager:
         job_seniority = extracted_skills.get('complexity_level', 'intermediate')
         focus_areas = extracted_skills.get('interview_focus_areas', ['general_technical'])
         
-        # Create session structure
-        session_phases = []
+        # Create session structure (duration is totalled as phases are added). Phases are
+        # kept as plain dicts so every session store returns the same shape
+        session_phases: List[Dict[str, Any]] = []
+        estimated_duration = 0
         
         if 'coding_problems' in focus_areas:
-            session_phases.append({
-                'phase': 'coding_assessment',
-                'duration_minutes': 30,
-                'question_count': 2,
-                'difficulty': self._match_difficulty_to_gap(user_seniority, job_seniority)
-            })
+            session_phases.append(asdict(SessionPhase('coding_assessment', 30, 2,
+                                                      self._match_difficulty_to_gap(user_seniority, job_seniority))))
+            estimated_duration += 30
         
         if 'system_design' in focus_areas:
-            session_phases.append({
-                'phase': 'system_design',
-                'duration_minutes': 25,
-                'question_count': 1,
-                'difficulty': job_seniority
-            })
+            session_phases.append(asdict(SessionPhase('system_design', 25, 1, job_seniority)))
+            estimated_duration += 25
         
         if 'technical_knowledge' in focus_areas:
-            session_phases.append({
-                'phase': 'technical_concepts',
-                'duration_minutes': 15,
-                'question_count': 3,
-                'difficulty': user_seniority
-            })
+            session_phases.append(asdict(SessionPhase('technical_concepts', 15, 3, user_seniority)))
+            estimated_duration += 15
         
         if 'behavioral_leadership' in focus_areas or user_seniority in ['mid', 'senior']:
-            session_phases.append({
-                'phase': 'behavioral',
-                'duration_minutes': 10,
-                'question_count': 2,
-                'difficulty': user_seniority
-            })
+            session_phases.append(asdict(SessionPhase('behavioral', 10, 2, user_seniority)))
+            estimated_duration += 10
         
         interview_plan['session_structure'] = session_phases
-        interview_plan['estimated_duration'] = sum(phase['duration_minutes'] for phase in session_phases)
+        interview_plan['estimated_duration'] = estimated_duration
         
         # Set adaptive parameters
         interview_plan['adaptive_parameters'] = {
@@ -408,6 +553,9 @@ class SessionManager:
         interview_plan['focus_areas'] = focus_areas
         interview_plan['question_categories'] = self._map_focus_to_question_categories(focus_areas)
         
+        if not self.verbose:
+            return interview_plan
+        
         print(f"📋 Interview plan created:")
         print(f"   Duration: ~{interview_plan['estimated_duration']} minutes")
         print(f"   Phases: {len(session_phases)}")
@@ -418,69 +566,152 @@ class SessionManager:
     
     def get_session_data(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve complete session data by ID."""
-        return self.active_sessions.get(session_id)
+        session_data = self.session_store.get(session_id)
+        if session_data is None:
+            return None
+        return self._session_snapshot(session_data)
     
     def update_session_status(self, session_id: str, status: str, additional_data: Dict = None) -> bool:
         """Update session status and optionally add additional data."""
-        if session_id in self.active_sessions:
-            self.active_sessions[session_id]['status'] = status
-            self.active_sessions[session_id]['last_updated'] = datetime.now().isoformat()
-            
-            if additional_data:
-                self.active_sessions[session_id].update(additional_data)
-            
-            return True
-        return False
+        session_data = self.session_store.get(session_id)
+        if session_data is None:
+            return False
+        
+        session_data['status'] = status
+        session_data['last_updated'] = datetime.now().isoformat()
+        
+        if additional_data:
+            session_data.update(additional_data)
+        
+        self.session_store.put(session_id, session_data)
+        return True
     
     def record_agent_interaction(self, session_id: str, agent_name: str, interaction_data: Dict) -> bool:
         """Record an agent interaction in the session log."""
-        if session_id in self.active_sessions:
-            interaction_record = {
-                'timestamp': datetime.now().isoformat(),
-                'agent': agent_name,
-                'interaction_type': interaction_data.get('type', 'unknown'),
-                'data': interaction_data
-            }
-            
-            self.active_sessions[session_id]['agent_interactions'].append(interaction_record)
-            return True
-        return False
+        session_data = self.session_store.get(session_id)
+        if session_data is None:
+            return False
+        
+        # Per-turn hot path: one row appended to the column log; ISO timestamps and
+        # per-interaction dicts are only built when the session is read
+        self._interaction_log(session_data).append(
+            time.time_ns(), agent_name, interaction_data.get('type', 'unknown'), interaction_data
+        )
+        self.session_store.put(session_id, session_data)
+        return True
     
     def finalize_session(self, session_id: str) -> Dict[str, Any]:
         """Finalize session and move to history."""
-        if session_id in self.active_sessions:
-            session_data = self.active_sessions[session_id]
-            session_data['status'] = 'completed'
-            session_data['completed_at'] = datetime.now().isoformat()
-            
-            # Move to history
-            self.session_history.append(session_data)
-            del self.active_sessions[session_id]
-            
-            # Store final session record in memory bank
-            self.memory_bank.store_completed_session(session_data)
+        session_data = self.session_store.pop(session_id)
+        if session_data is None:
+            return {}
+        
+        session_data['status'] = 'completed'
+        session_data['completed_at'] = datetime.now().isoformat()
+        session_data = self._session_snapshot(session_data)
+        
+        # Move to history
+        self.session_history.append(session_data)
+        
+        # Store final session record in memory bank
+        self.memory_bank.store_completed_session(session_data)
+        
+        return session_data
+    
+    def batch_recompute_confidence(self) -> List[float]:
+        """
+        Recompute the self-assessed confidence of every finished session at once.
+        
+        All self-assessment scores are flattened into one array and averaged per session
+        with a single weighted bincount, so sessions may rate different numbers of skills.
+        
+        Returns:
+            Confidence score (0-1) per entry of session_history, in order
+        """
+        assessments = [
+            session_data.get('user_profile', {}).get('experience', {}).get('self_assessment', {})
+            for session_data in self.session_history
+        ]
+        
+        try:
+            import numpy as np
+        except ImportError:  # Batch recompute is optional; score sessions one at a time
+            return [self._calculate_confidence_score({'self_assessment': a}) for a in assessments]
+        
+        counts = np.fromiter((len(a) for a in assessments), dtype=np.intp, count=len(assessments))
+        scores = np.fromiter((score for a in assessments for score in a.values()),
+                             dtype=np.float64, count=int(counts.sum()))
+        totals = np.bincount(np.repeat(np.arange(len(assessments)), counts),
+                             weights=scores, minlength=len(assessments))
+        
+        confidence = np.full(len(assessments), 0.5)  # Default moderate confidence
+        rated = counts > 0
+        confidence[rated] = totals[rated] / counts[rated] / 5.0  # Normalize to 0-1 scale
+        return confidence.tolist()
+    
+    def categorize_experience_levels(self, years: Iterable[float]) -> List[str]:
+        """
+        Categorize many experience values at once (e.g. every session in session_history).
+        
+        Args:
+            years: Years of experience per user
             
-            return session_data
-        return {}
+        Returns:
+            Experience level per value, as _categorize_experience_level would return it
+        """
+        years = list(years)
+        try:
+            import numpy as np
+        except ImportError:  # Batch categorization is optional; fall back to the scalar path
+            return [self._categorize_experience_level(value) for value in years]
+        
+        # right=True makes each bound inclusive, matching the scalar `years <= bound` checks
+        level_idx = np.digitize(np.asarray(years, dtype=np.float64), EXPERIENCE_LEVEL_MAX_YEARS, right=True)
+        return np.asarray(EXPERIENCE_LEVELS)[level_idx].tolist()
     
     # Helper methods
     
+    def _input(self, prompt: str = "") -> str:
+        """input() for interactive terminals; the next queued line when stdin is piped."""
+        if self._interactive:
+            return input(prompt)
+        line = self._read_line()
+        if line is None:
+            raise EOFError(prompt)
+        return line
+    
+    def _read_line(self) -> Optional[str]:
+        """Read one stdin line without its newline (None at EOF)."""
+        if self._interactive:
+            raw_line = sys.stdin.readline()
+            return raw_line.rstrip('\n') if raw_line else None
+        
+        if self._stdin_lines is None:
+            self._stdin_lines = deque(sys.stdin.read().splitlines())
+        return self._stdin_lines.popleft() if self._stdin_lines else None
+    
+    def _interaction_log(self, session_data: Dict[str, Any]) -> InteractionLog:
+        """Return the session's interaction log, rebuilding it after a store round-trip."""
+        interaction_log = session_data.get('agent_interactions')
+        if not isinstance(interaction_log, InteractionLog):
+            # Serializing stores hand the log back as its plain columns
+            interaction_log = InteractionLog.from_columns(interaction_log or {})
+            session_data['agent_interactions'] = interaction_log
+        return interaction_log
+    
+    def _session_snapshot(self, session_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy of the session with agent_interactions as one dict per interaction."""
+        return {**session_data, 'agent_interactions': self._interaction_log(session_data).records()}
+    
     def _generate_session_id(self) -> str:
         """Generate unique session identifier."""
-        return f"atic_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{str(uuid.uuid4())[:8]}"
+        # Nanosecond time keeps IDs sortable by creation; the random suffix keeps them unique
+        return f"atic_{time.time_ns()}_{secrets.token_hex(4)}"
     
-    def _get_skill_areas_for_field(self, field: str) -> List[str]:
+    @staticmethod
+    def _get_skill_areas_for_field(field: str) -> Tuple[str, ...]:
         """Get relevant skill areas for technical field assessment."""
-        field_skills = {
-            'front-end': ['JavaScript/TypeScript', 'React/Vue/Angular', 'CSS/Styling', 'Web Performance', 'Testing'],
-            'back-end': ['System Design', 'Database Design', 'API Development', 'Scalability', 'Security'],
-            'full-stack': ['Frontend Development', 'Backend Development', 'Database Design', 'System Architecture', 'DevOps'],
-            'data science': ['Machine Learning', 'Statistics', 'Python/R', 'Data Processing', 'Visualization'],
-            'devops': ['Infrastructure', 'CI/CD', 'Monitoring', 'Cloud Platforms', 'Automation'],
-            'mobile': ['iOS/Android Development', 'Mobile UI/UX', 'Performance', 'Testing', 'App Store'],
-            'qa': ['Test Automation', 'Manual Testing', 'Performance Testing', 'Security Testing', 'Tools']
-        }
-        return field_skills.get(field, ['Problem Solving', 'Algorithms', 'Data Structures', 'System Design', 'Communication'])
+        return FIELD_SKILLS.get(field, DEFAULT_SKILL_AREAS)
     
     def _categorize_experience_level(self, years: int) -> str:
         """Categorize experience level based on years."""
@@ -519,10 +750,8 @@ class SessionManager:
     
     def _match_difficulty_to_gap(self, user_seniority: str, job_seniority: str) -> str:
         """Match difficulty based on gap between user and job requirements."""
-        seniority_levels = {'junior': 1, 'mid': 2, 'senior': 3}
-        
-        user_score = seniority_levels.get(user_seniority, 2)
-        job_score = seniority_levels.get(job_seniority, 2)
+        user_score = SENIORITY_RANKS.get(user_seniority, 2)
+        job_score = SENIORITY_RANKS.get(job_seniority, 2)
         
         if job_score > user_score:
             return job_seniority  # Challenge user with target level
@@ -540,16 +769,10 @@ class SessionManager:
     
     def _map_focus_to_question_categories(self, focus_areas: List[str]) -> List[str]:
         """Map focus areas to specific question categories."""
-        category_mapping = {
-            'coding_problems': ['algorithms', 'data_structures', 'problem_solving'],
-            'system_design': ['scalability', 'architecture', 'trade_offs'],
-            'technical_knowledge': ['concepts', 'best_practices', 'tools'],
-            'behavioral_leadership': ['leadership', 'teamwork', 'communication'],
-            'general_technical': ['algorithms', 'concepts', 'problem_solving']
-        }
-        
-        categories = []
-        for focus in focus_areas:
-            categories.extend(category_mapping.get(focus, ['general']))
-        
-        return list(set(categories))  # Remove duplicates
\ No newline at end of file
+        return list(_question_categories_for(tuple(focus_areas)))
+
+
+@lru_cache(maxsize=1)
+def get_session_manager() -> SessionManager:
+    """Return the shared Session Manager backed by the shared Memory Bank."""
+    return SessionManager(get_memory_bank())
@@ -0,0 +1,179 @@
+"""
+Session Store
+Author: Amin Motiwala
+
+Pluggable storage for in-progress ATIC sessions. Active sessions live in a bounded
+in-process LRU by default, or in Memcached so several coach workers can serve the
+same session and a worker restart does not lose it.
+"""
+
+import os
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Protocol, Tuple
+
+import orjson
+
+try:
+    from pymemcache.client.hash import HashClient
+except ImportError:  # Sessions stay in-process when pymemcache is not installed
+    HashClient = None
+
+
+# Active sessions are dropped a day after their last write
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+
+
+def _json_default(value: Any) -> Any:
+    """Encode values orjson has no native form for (typed arrays as lists, others as str)."""
+    if isinstance(value, array):
+        return value.tolist()
+    return str(value)
+
+
+class SessionStore(Protocol):
+    """Storage interface used by SessionManager for active sessions."""
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Return the session data for session_id, or None if missing/expired."""
+        ...
+
+    def put(self, session_id: str, session_data: Dict[str, Any],
+            ttl_seconds: Optional[int] = None) -> None:
+        """Store session_data, expiring after ttl_seconds (None = store default)."""
+        ...
+
+    def pop(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Remove and return the session data for session_id (None if missing)."""
+        ...
+
+
+class MemorySessionStore:
+    """
+    In-process session store.
+
+    Sessions live in an LRU-ordered dict capped at max_sessions, so a long-running
+    worker cannot grow without bound; they are lost when the process exits.
+    """
+
+    DEFAULT_MAX_SESSIONS = 1024
+
+    def __init__(self, max_sessions: int = DEFAULT_MAX_SESSIONS,
+                 ttl_seconds: Optional[int] = DEFAULT_TTL_SECONDS):
+        """
+        Initialize the in-process session store.
+
+        Args:
+            max_sessions: Sessions kept before the least recently used one is evicted
+            ttl_seconds: Default session lifetime (None = never expire)
+        """
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, Tuple[Dict[str, Any], Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+
+            session_data, expires_at = entry
+            if expires_at is not None and expires_at < time.time():
+                del self._sessions[session_id]
+                return None
+            self._sessions.move_to_end(session_id)
+            return session_data
+
+    def put(self, session_id: str, session_data: Dict[str, Any],
+            ttl_seconds: Optional[int] = None) -> None:
+        ttl_seconds = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        expires_at = time.time() + ttl_seconds if ttl_seconds else None
+        with self._lock:
+            self._sessions[session_id] = (session_data, expires_at)
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def pop(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+        if entry is None:
+            return None
+
+        session_data, expires_at = entry
+        if expires_at is not None and expires_at < time.time():
+            return None
+        return session_data
+
+
+class MemcachedSessionStore:
+    """
+    Memcached-backed session store shared by every coach worker.
+
+    Sessions are serialized with orjson; keys are spread over the servers by
+    pymemcache's consistent hashing, which is stable across processes (Python's
+    built-in hash() is salted per process and cannot be used for sharding).
+    """
+
+    KEY_PREFIX = 'atic:session:'
+
+    def __init__(self, servers: List[Tuple[str, int]],
+                 ttl_seconds: Optional[int] = DEFAULT_TTL_SECONDS):
+        """
+        Initialize the Memcached session store.
+
+        Args:
+            servers: (host, port) of every Memcached node
+            ttl_seconds: Default session lifetime (None = never expire)
+        """
+        if HashClient is None:
+            raise RuntimeError("pymemcache is required for MemcachedSessionStore")
+
+        self.ttl_seconds = ttl_seconds
+        self.client = HashClient(servers, use_pooling=True)
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        value = self.client.get(self.KEY_PREFIX + session_id)
+        return orjson.loads(value) if value is not None else None
+
+    def put(self, session_id: str, session_data: Dict[str, Any],
+            ttl_seconds: Optional[int] = None) -> None:
+        ttl_seconds = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        # Dataclasses (e.g. the interaction log) serialize natively as their fields
+        value = orjson.dumps(session_data, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+        self.client.set(self.KEY_PREFIX + session_id, value, expire=ttl_seconds or 0)
+
+    def pop(self, session_id: str) -> Optional[Dict[str, Any]]:
+        session_data = self.get(session_id)
+        if session_data is not None:
+            self.client.delete(self.KEY_PREFIX + session_id)
+        return session_data
+
+
+def _parse_servers(spec: str) -> List[Tuple[str, int]]:
+    """Parse 'host:port,host:port' into (host, port) pairs (default port 11211)."""
+    servers = []
+    for server in filter(None, (part.strip() for part in spec.split(','))):
+        host, _, port = server.partition(':')
+        servers.append((host, int(port or 11211)))
+    return servers
+
+
+@lru_cache(maxsize=1)
+def get_session_store() -> SessionStore:
+    """
+    Return the shared session store.
+
+    Uses Memcached when ATIC_MEMCACHED_SERVERS lists nodes and pymemcache is installed,
+    otherwise the in-process store.
+    """
+    servers = _parse_servers(os.getenv("ATIC_MEMCACHED_SERVERS", ""))
+    if servers and HashClient is not None:
+        return MemcachedSessionStore(servers)
+    if servers:
+        print("⚠️ pymemcache not installed. Sessions will be kept in-process.")
+    return MemorySessionStore()
@@ -0,0 +1,94 @@
+/*
+ * Java Batch Runner
+ * Author: Amin Motiwala
+ *
+ * Runs a compiled solution's main() once per test input inside a single JVM, so
+ * CodeExecutionTool pays JVM startup once per batch instead of once per test.
+ *
+ * Usage: java -cp <runner dir> ATICBatchRunner <class name> <class dir> <io dir> <timeout ms> <test count>
+ *
+ * Test i reads <io dir>/input_i.txt as System.in and writes stdout_i.txt, stderr_i.txt
+ * and status_i.txt (exit code, or "timeout"). Each test loads the solution through a
+ * fresh class loader so static state and static initializers start over, exactly as
+ * in a separate JVM. A missing status file means the test did not run.
+ */
+
+import java.io.InputStream;
+import java.io.PrintStream;
+import java.lang.reflect.InvocationTargetException;
+import java.lang.reflect.Method;
+import java.net.URL;
+import java.net.URLClassLoader;
+import java.nio.charset.StandardCharsets;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.nio.file.Paths;
+import java.util.Arrays;
+
+public final class ATICBatchRunner {
+
+    public static void main(String[] args) throws Exception {
+        String className = args[0];
+        URL[] classPath = {Paths.get(args[1]).toUri().toURL()};
+        Path dir = Paths.get(args[2]);
+        long timeoutMillis = Long.parseLong(args[3]);
+        int testCount = Integer.parseInt(args[4]);
+
+        for (int i = 1; i <= testCount; i++) {
+            String status;
+            try (InputStream in = Files.newInputStream(dir.resolve("input_" + i + ".txt"));
+                 PrintStream out = new PrintStream(Files.newOutputStream(dir.resolve("stdout_" + i + ".txt")), true);
+                 PrintStream err = new PrintStream(Files.newOutputStream(dir.resolve("stderr_" + i + ".txt")), true);
+                 URLClassLoader loader = new URLClassLoader(classPath, ClassLoader.getPlatformClassLoader())) {
+                System.setIn(in);
+                System.setOut(out);
+                System.setErr(err);
+
+                // A class without main() makes the whole batch fall back to separate runs
+                Method solutionMain = loader.loadClass(className).getMethod("main", String[].class);
+                int[] exitCode = {0};
+                Thread runner = new Thread(() -> {
+                    try {
+                        solutionMain.invoke(null, (Object) new String[0]);
+                    } catch (InvocationTargetException e) {
+                        exitCode[0] = 1;
+                        reportUncaught(e.getCause(), err);
+                    } catch (Throwable e) {
+                        exitCode[0] = 1;
+                        reportUncaught(e, err);
+                    }
+                }, "main");
+                runner.setDaemon(true);
+                runner.start();
+                runner.join(timeoutMillis);
+
+                out.flush();
+                err.flush();
+                status = runner.isAlive() ? "timeout" : Integer.toString(exitCode[0]);
+            }
+
+            Files.write(dir.resolve("status_" + i + ".txt"), status.getBytes(StandardCharsets.UTF_8));
+            if (status.equals("timeout")) {
+                // The solution thread cannot be stopped; later tests run in their own JVMs
+                Runtime.getRuntime().halt(0);
+            }
+        }
+    }
+
+    /** Print an uncaught exception the way the JVM does, without the reflection frames. */
+    private static void reportUncaught(Throwable e, PrintStream err) {
+        StackTraceElement[] trace = e.getStackTrace();
+        int keep = 0;
+        while (keep < trace.length && !isReflectionFrame(trace[keep])) {
+            keep++;
+        }
+        e.setStackTrace(Arrays.copyOf(trace, keep));
+        err.print("Exception in thread \"main\" ");
+        e.printStackTrace(err);
+    }
+
+    private static boolean isReflectionFrame(StackTraceElement frame) {
+        String className = frame.getClassName();
+        return className.startsWith("jdk.internal.reflect.") || className.equals("java.lang.reflect.Method");
+    }
+}
@@ -6,14 +6,274 @@ Implements secure code execution capabilities for technical coding assessment
 during interviews. Supports Python and Java with execution results and security measures.
 """
 
+import atexit
+import hashlib
 import subprocess
 import tempfile
 import os
+import re
+import select
+import shutil
 import sys
+import threading
 import time
-from typing import Dict, Any, Optional, List
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Dict, Any, Optional, List, Tuple, Union
 import json
 
+from tools.python_worker import read_frame, write_frame
+
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'python_worker.py')
+JAVA_BATCH_RUNNER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ATICBatchRunner.java')
+
+
+def _pipe_size(preferred: int = 1 << 20) -> int:
+    """Pipe buffer size for child processes (0 = OS default where it cannot be raised)."""
+    try:
+        with open('/proc/sys/fs/pipe-max-size') as f:
+            return min(preferred, int(f.read()))
+    except (OSError, ValueError):
+        return 0
+
+
+# 1 MiB pipes let programs write large outputs without stalling on a full 64 KiB pipe
+PIPE_SIZE = _pipe_size()
+
+
+# Test inputs may be text or pre-encoded UTF-8 bytes (bytes skip the encode entirely)
+TestInput = Union[str, bytes]
+
+
+def _encode_input(test_input: TestInput) -> bytes:
+    """Return a test input as UTF-8 bytes."""
+    return test_input.encode('utf-8') if isinstance(test_input, str) else test_input
+
+
+def _decode_output(output: bytes) -> str:
+    """Decode program output the way text-mode pipes did (UTF-8, universal newlines)."""
+    text = output.decode('utf-8', errors='replace')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+# Substrings that mark code as unsafe. The shared patterns ignore case; Java API names
+# are case-sensitive identifiers and must match exactly
+_COMMON_DANGEROUS_PATTERNS = (
+    'import os', 'import subprocess', 'exec(', 'eval(',
+    '__import__', 'open(', 'file(', 'delete', 'remove'
+)
+# 'File(' is already covered by the case-insensitive 'file('
+_JAVA_DANGEROUS_PATTERNS = (
+    'Runtime.getRuntime', 'ProcessBuilder', 'System.exit', 'FileWriter', 'FileReader'
+)
+DANGEROUS_PATTERNS: Dict[str, Tuple[str, ...]] = {
+    'python': _COMMON_DANGEROUS_PATTERNS,
+    'java': _COMMON_DANGEROUS_PATTERNS + _JAVA_DANGEROUS_PATTERNS
+}
+_EXACT_CASE_PATTERNS = frozenset(_JAVA_DANGEROUS_PATTERNS)
+
+
+def _security_scanner(patterns: Tuple[str, ...]) -> re.Pattern:
+    """Compile patterns into one scan; the lookahead also reports overlapping hits."""
+    folded = '|'.join(re.escape(pattern) for pattern in patterns if pattern not in _EXACT_CASE_PATTERNS)
+    alternatives = [f'(?i:{folded})'] + [re.escape(pattern) for pattern in patterns if pattern in _EXACT_CASE_PATTERNS]
+    return re.compile('(?=(' + '|'.join(alternatives) + '))')
+
+
+_SECURITY_SCANNERS = {patterns: _security_scanner(patterns) for patterns in DANGEROUS_PATTERNS.values()}
+
+
+# A public class declaration wins over any earlier non-public one
+_JAVA_CLASS_RE = re.compile(r'(public\s+)?class\s+(\w+)')
+
+
+@lru_cache(maxsize=128)
+def _java_class_name(code: str) -> Optional[str]:
+    """Return the public class name of Java code, else its first class name (None if no class)."""
+    first_class = None
+    for match in _JAVA_CLASS_RE.finditer(code):
+        if match.group(1):
+            return match.group(2)
+        if first_class is None:
+            first_class = match.group(2)
+    return first_class
+
+
+class _PythonWorker:
+    """One long-lived interpreter running tools/python_worker.py."""
+    
+    # Extra wait on top of the program's timeout before the worker itself is presumed stuck
+    GRACE_SECONDS = 5
+    
+    def __init__(self):
+        self.process = subprocess.Popen(
+            [sys.executable, WORKER_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            pipesize=PIPE_SIZE
+        )
+    
+    def run(self, code: str, source_file: str, cwd: str, input_text: TestInput,
+            timeout_seconds: float) -> Dict[str, Any]:
+        """
+        Run one program in a fresh child of this worker.
+        
+        Raises:
+            subprocess.TimeoutExpired: The program did not finish within timeout_seconds
+            EOFError: The worker exited while running the program
+        """
+        write_frame(self.process.stdin, (code, _encode_input(input_text), cwd, source_file, timeout_seconds))
+        
+        ready, _, _ = select.select([self.process.stdout], [], [], timeout_seconds + self.GRACE_SECONDS)
+        if not ready:
+            raise EOFError("Python worker stopped responding")
+        
+        reply = read_frame(self.process.stdout)
+        if reply is None:
+            raise EOFError("Python worker exited")
+        
+        stdout, stderr, return_code, timed_out = reply
+        if timed_out:
+            raise subprocess.TimeoutExpired(source_file, timeout_seconds)
+        return {
+            'stdout': _decode_output(stdout),
+            'stderr': _decode_output(stderr),
+            'return_code': return_code
+        }
+    
+    def kill(self) -> None:
+        """Stop the worker process."""
+        self.process.kill()
+        self.process.wait()
+
+
+class _PythonWorkerPool:
+    """
+    Pool of pre-started Python interpreters shared by every CodeExecutionTool.
+    
+    This class implements:
+    - Interpreter startup paid once per worker instead of once per execution
+    - Workers started on demand, up to size of them
+    - LIFO reuse of idle workers (the most recently used one is warmest)
+    - One forked child per program, so no program sees state left by another
+    - At most size programs at once; further callers wait for a free worker
+    - Kill and respawn of workers that crash or stop responding
+    - close() to stop idle workers at shutdown
+    """
+    
+    def __init__(self, size: int):
+        """
+        Initialize the worker pool.
+        
+        Args:
+            size: Maximum number of workers (and of programs running at once)
+        """
+        self.size = size
+        self._lock = threading.Lock()
+        # Concurrent executions share the pool; holding a slot allows one worker
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle: List[_PythonWorker] = []
+    
+    def run(self, code: str, source_file: str, cwd: str, input_text: TestInput,
+            timeout_seconds: float) -> Dict[str, Any]:
+        """Run one program on an idle worker, in the _run_subprocess result format."""
+        with self._slots:
+            return self._run_on_worker(code, source_file, cwd, input_text, timeout_seconds)
+    
+    def _run_on_worker(self, code: str, source_file: str, cwd: str, input_text: TestInput,
+                       timeout_seconds: float) -> Dict[str, Any]:
+        """Run one program on a worker taken from the idle list."""
+        worker = self._acquire()
+        
+        try:
+            result = worker.run(code, source_file, cwd, input_text, timeout_seconds)
+        except subprocess.TimeoutExpired:
+            # The worker already killed the program; it is ready for the next one
+            self._release(worker)
+            return {
+                'stdout': '',
+                'stderr': f'Execution timed out after {timeout_seconds} seconds',
+                'return_code': -1
+            }
+        except Exception as e:
+            worker.kill()
+            return {
+                'stdout': '',
+                'stderr': f'Execution error: {str(e)}',
+                'return_code': -1
+            }
+        
+        self._release(worker)
+        return result
+    
+    def _acquire(self) -> _PythonWorker:
+        """Take the most recently used idle worker, starting one if none is idle."""
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.process.poll() is None:
+                    return worker
+        return _PythonWorker()
+    
+    def _release(self, worker: _PythonWorker) -> None:
+        """Return a worker to the pool, stopping it if the pool is already full."""
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(worker)
+                return
+        worker.kill()
+    
+    def close(self) -> None:
+        """Stop every idle worker."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.kill()
+
+
+@lru_cache(maxsize=8)
+def _probe_available_languages(version_checks: Tuple[Tuple[str, Tuple[str, ...]], ...]) -> Tuple[str, ...]:
+    """
+    Run each language's version check once per process.
+    
+    Args:
+        version_checks: (language, version check command) pairs
+        
+    Returns:
+        Languages whose toolchain responded
+    """
+    available = []
+    
+    for lang, version_check in version_checks:
+        try:
+            result = subprocess.run(
+                list(version_check),
+                capture_output=True,
+                text=True,
+                timeout=5
+            )
+            if result.returncode == 0 or lang == 'java':  # Java returns non-zero for version
+                available.append(lang)
+        except (subprocess.TimeoutExpired, FileNotFoundError):
+            continue
+    
+    print(f"🔧 Code execution available for: {', '.join(available)}")
+    return tuple(available)
+
+
+@lru_cache(maxsize=1)
+def _get_python_worker_pool() -> _PythonWorkerPool:
+    """Return the shared Python worker pool; workers start as executions need them."""
+    pool = _PythonWorkerPool(size=os.cpu_count() or 1)
+    atexit.register(pool.close)
+    return pool
+
 
 class CodeExecutionTool:
     """
@@ -24,8 +284,11 @@ class CodeExecutionTool:
     - Secure sandboxed execution environment
     - Timeout and resource limits
     - Detailed execution results and error reporting
+    - Reuse of compiled Java classes for repeated submissions
     """
     
+    JAVA_CLASS_CACHE_SIZE = 64  # Compiled submissions kept per tool instance
+    
     def __init__(self, timeout_seconds: int = 10):
         """
         Initialize the code execution tool.
@@ -34,6 +297,9 @@ class CodeExecutionTool:
             timeout_seconds: Maximum execution time per code snippet
         """
         self.timeout_seconds = timeout_seconds
+        # Toolchains are resolved on PATH once; children are started by absolute path
+        self._java = shutil.which('java') or 'java'
+        self._javac = shutil.which('javac') or 'javac'
         self.supported_languages = {
             'python': {
                 'extension': '.py',
@@ -42,42 +308,39 @@ class CodeExecutionTool:
             },
             'java': {
                 'extension': '.java',
-                'command': ['java'],
-                'compile_command': ['javac'],
-                'version_check': ['java', '-version']
+                'command': [self._java],
+                'compile_command': [self._javac],
+                'version_check': [self._java, '-version']
             }
         }
         
         self._check_available_languages()
+        self._python_pool = _get_python_worker_pool() if 'python' in self.available_languages else None
+        
+        # Long-lived scratch directory: per-run subdirectories, compiled Java classes
+        # (keyed by source hash) and the compiled batch runner; removed with the tool
+        self._scratch_dir = tempfile.mkdtemp(prefix='atic_exec_')
+        weakref.finalize(self, shutil.rmtree, self._scratch_dir, ignore_errors=True)
+        self._java_classes: "OrderedDict[bytes, Tuple[str, Dict[str, Any]]]" = OrderedDict()
+        self._java_classes_lock = threading.Lock()
+        self._java_runner_dir: Optional[str] = None
+        self._java_runner_lock = threading.Lock()
     
     def _check_available_languages(self) -> None:
         """Check which programming languages are available for execution."""
-        available = []
-        
-        for lang, config in self.supported_languages.items():
-            try:
-                result = subprocess.run(
-                    config['version_check'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                if result.returncode == 0 or lang == 'java':  # Java returns non-zero for version
-                    available.append(lang)
-            except (subprocess.TimeoutExpired, FileNotFoundError):
-                continue
-        
-        self.available_languages = available
-        print(f"🔧 Code execution available for: {', '.join(available)}")
+        version_checks = tuple(
+            (lang, tuple(config['version_check'])) for lang, config in self.supported_languages.items()
+        )
+        self.available_languages = list(_probe_available_languages(version_checks))
     
-    def execute(self, code: str, language: str = 'python', test_inputs: Optional[List[str]] = None) -> Dict[str, Any]:
+    def execute(self, code: str, language: str = 'python', test_inputs: Optional[List[TestInput]] = None) -> Dict[str, Any]:
         """
         Execute code in a secure environment.
         
         Args:
             code: Source code to execute
             language: Programming language ('python' or 'java')
-            test_inputs: Optional list of test inputs for the program
+            test_inputs: Optional list of test inputs for the program (str or UTF-8 bytes)
             
         Returns:
             Dict containing execution results
@@ -107,7 +370,7 @@ class CodeExecutionTool:
             return execution_result
         
         try:
-            with tempfile.TemporaryDirectory() as temp_dir:
+            with tempfile.TemporaryDirectory(dir=self._scratch_dir) as temp_dir:
                 start_time = time.time()
                 
                 if language == 'java':
@@ -122,7 +385,7 @@ class CodeExecutionTool:
         
         return execution_result
     
-    def _execute_python_code(self, code: str, temp_dir: str, test_inputs: Optional[List[str]] = None) -> Dict[str, Any]:
+    def _execute_python_code(self, code: str, temp_dir: str, test_inputs: Optional[List[TestInput]] = None) -> Dict[str, Any]:
         """Execute Python code."""
         source_file = os.path.join(temp_dir, "solution.py")
         with open(source_file, 'w') as f:
@@ -136,11 +399,12 @@ class CodeExecutionTool:
             'test_results': []
         }
         
-        command = [sys.executable, source_file]
-        
         if test_inputs:
-            for i, test_input in enumerate(test_inputs):
-                result = self._run_subprocess(command, temp_dir, test_input)
+            results = self._run_concurrently(
+                lambda test_input: self._python_pool.run(code, source_file, temp_dir, test_input, self.timeout_seconds),
+                test_inputs
+            )
+            for i, (test_input, result) in enumerate(zip(test_inputs, results)):
                 test_result = {
                     'test_case': i + 1,
                     'input': test_input,
@@ -153,20 +417,16 @@ class CodeExecutionTool:
                 if i == 0:  # Update overall result from first test
                     execution_result.update(result)
         else:
-            result = self._run_subprocess(command, temp_dir)
+            result = self._python_pool.run(code, source_file, temp_dir, "", self.timeout_seconds)
             execution_result.update(result)
         
         execution_result['success'] = execution_result['return_code'] == 0
         return execution_result
     
-    def _execute_java_code(self, code: str, temp_dir: str, test_inputs: Optional[List[str]] = None) -> Dict[str, Any]:
+    def _execute_java_code(self, code: str, temp_dir: str, test_inputs: Optional[List[TestInput]] = None) -> Dict[str, Any]:
         """Execute Java code."""
         # Extract class name from code
         class_name = self._extract_java_class_name(code) or "Solution"
-        java_file = os.path.join(temp_dir, f"{class_name}.java")
-        
-        with open(java_file, 'w') as f:
-            f.write(code)
         
         execution_result = {
             'success': False,
@@ -177,21 +437,28 @@ class CodeExecutionTool:
             'test_results': []
         }
         
-        # Compile Java code
-        compile_result = self._run_subprocess(['javac', java_file], temp_dir)
+        # Compile Java code (identical submissions reuse their classes)
+        class_dir, compile_result = self._compile_java(code, class_name)
         execution_result['compilation_output'] = compile_result['stderr']
         
-        if compile_result['return_code'] != 0:
+        if class_dir is None:
             execution_result['error_message'] = "Compilation failed"
             execution_result['stderr'] = compile_result['stderr']
             return execution_result
         
-        # Execute compiled Java code
-        command = ['java', '-cp', temp_dir, class_name]
+        # Execute compiled Java code (several tests share one JVM through the batch runner)
+        command = [self._java, '-cp', class_dir, class_name]
+        runner_dir = self._get_java_runner_dir() if test_inputs and len(test_inputs) > 1 else None
         
         if test_inputs:
-            for i, test_input in enumerate(test_inputs):
-                result = self._run_subprocess(command, temp_dir, test_input)
+            results = (self._run_java_batch(runner_dir, class_name, class_dir, temp_dir, test_inputs)
+                       if runner_dir else [])
+            # Tests the batch did not reach (e.g. after System.exit) run in their own JVMs
+            results += self._run_concurrently(
+                lambda test_input: self._run_subprocess(command, temp_dir, test_input),
+                test_inputs[len(results):]
+            )
+            for i, (test_input, result) in enumerate(zip(test_inputs, results)):
                 test_result = {
                     'test_case': i + 1,
                     'input': test_input,
@@ -210,21 +477,129 @@ class CodeExecutionTool:
         execution_result['success'] = execution_result['return_code'] == 0
         return execution_result
     
-    def _run_subprocess(self, command: List[str], cwd: str, input_text: str = "") -> Dict[str, Any]:
+    def _run_concurrently(self, run_test: Callable[[TestInput], Dict[str, Any]],
+                          test_inputs: List[TestInput]) -> List[Dict[str, Any]]:
+        """Run independent test inputs in parallel, returning their results in input order."""
+        if len(test_inputs) <= 1:
+            return [run_test(test_input) for test_input in test_inputs]
+        
+        with ThreadPoolExecutor(max_workers=min(len(test_inputs), os.cpu_count() or 1)) as executor:
+            return list(executor.map(run_test, test_inputs))
+    
+    def _compile_java(self, code: str, class_name: str) -> Tuple[Optional[str], Dict[str, Any]]:
+        """
+        Compile Java code, reusing the classes of an identical earlier submission.
+        
+        Returns:
+            Tuple of (directory holding the compiled classes, or None if compilation
+            failed, and the javac result)
+        """
+        key = hashlib.blake2b(code.encode('utf-8'), digest_size=16).digest()
+        with self._java_classes_lock:
+            cached = self._java_classes.get(key)
+            if cached is not None:
+                self._java_classes.move_to_end(key)
+                return cached
+        
+        class_dir = tempfile.mkdtemp(prefix='java_', dir=self._scratch_dir)
+        java_file = os.path.join(class_dir, f"{class_name}.java")
+        with open(java_file, 'w') as f:
+            f.write(code)
+        
+        compile_result = self._run_subprocess([self._javac, java_file], class_dir)
+        if compile_result['return_code'] != 0:
+            shutil.rmtree(class_dir, ignore_errors=True)
+            return None, compile_result
+        
+        with self._java_classes_lock:
+            cached = self._java_classes.get(key)
+            if cached is not None:  # Compiled concurrently by another execution
+                shutil.rmtree(class_dir, ignore_errors=True)
+                return cached
+            
+            self._java_classes[key] = (class_dir, compile_result)
+            while len(self._java_classes) > self.JAVA_CLASS_CACHE_SIZE:
+                _, (evicted_dir, _) = self._java_classes.popitem(last=False)
+                shutil.rmtree(evicted_dir, ignore_errors=True)
+        return class_dir, compile_result
+    
+    def _get_java_runner_dir(self) -> Optional[str]:
+        """Return the directory of the compiled batch runner, compiling it on first use (None if that fails)."""
+        with self._java_runner_lock:
+            if self._java_runner_dir is None:
+                runner_dir = os.path.join(self._scratch_dir, 'runner')
+                os.makedirs(runner_dir, exist_ok=True)
+                result = self._run_subprocess([self._javac, '-d', runner_dir, JAVA_BATCH_RUNNER], runner_dir)
+                self._java_runner_dir = runner_dir if result['return_code'] == 0 else ''
+        return self._java_runner_dir or None
+    
+    def _run_java_batch(self, runner_dir: str, class_name: str, class_dir: str, temp_dir: str,
+                        test_inputs: List[TestInput]) -> List[Dict[str, Any]]:
+        """
+        Run every test input in one JVM through ATICBatchRunner.
+        
+        Test inputs and outputs are exchanged through files in temp_dir.
+        
+        Returns:
+            Results of the leading tests the runner finished, in _run_subprocess format
+        """
+        for i, test_input in enumerate(test_inputs, start=1):
+            with open(os.path.join(temp_dir, f"input_{i}.txt"), 'wb') as f:
+                f.write(_encode_input(test_input))
+        
+        command = [self._java, '-cp', runner_dir, 'ATICBatchRunner', class_name, class_dir, temp_dir,
+                   str(self.timeout_seconds * 1000), str(len(test_inputs))]
+        try:
+            # Test output goes to files; the runner itself prints nothing worth keeping
+            subprocess.run(command, cwd=temp_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                           timeout=self.timeout_seconds * (len(test_inputs) + 1))
+        except subprocess.TimeoutExpired:
+            pass  # Tests finished before the stall still count
+        
+        results = []
+        for i in range(1, len(test_inputs) + 1):
+            status_file = os.path.join(temp_dir, f"status_{i}.txt")
+            if not os.path.exists(status_file):
+                break
+            
+            with open(status_file, encoding='utf-8') as f:
+                status = f.read().strip()
+            if status == 'timeout':
+                results.append({
+                    'stdout': '',
+                    'stderr': f'Execution timed out after {self.timeout_seconds} seconds',
+                    'return_code': -1
+                })
+                break
+            
+            with open(os.path.join(temp_dir, f"stdout_{i}.txt"), encoding='utf-8', errors='replace') as f:
+                stdout = f.read()
+            with open(os.path.join(temp_dir, f"stderr_{i}.txt"), encoding='utf-8', errors='replace') as f:
+                stderr = f.read()
+            results.append({
+                'stdout': stdout,
+                'stderr': stderr,
+                'return_code': int(status)
+            })
+        
+        return results
+    
+    def _run_subprocess(self, command: List[str], cwd: str, input_text: TestInput = b"") -> Dict[str, Any]:
         """Run subprocess with timeout and security limits."""
         try:
+            # Binary pipes: str input is encoded exactly once, bytes input is passed as-is
             result = subprocess.run(
                 command,
                 cwd=cwd,
-                input=input_text,
+                input=_encode_input(input_text),
                 capture_output=True,
-                text=True,
+                pipesize=PIPE_SIZE,
                 timeout=self.timeout_seconds
             )
             
             return {
-                'stdout': result.stdout,
-                'stderr': result.stderr,
+                'stdout': _decode_output(result.stdout),
+                'stderr': _decode_output(result.stderr),
                 'return_code': result.returncode
             }
             
@@ -248,24 +623,15 @@ class CodeExecutionTool:
             'violations': []
         }
         
-        code_lower = code.lower()
-        
-        # Dangerous patterns
-        dangerous_patterns = [
-            'import os', 'import subprocess', 'exec(', 'eval(',
-            '__import__', 'open(', 'file(', 'delete', 'remove'
+        # Hits are reported once per pattern, in pattern order
+        patterns = DANGEROUS_PATTERNS.get(language, DANGEROUS_PATTERNS['python'])
+        hits = set(_SECURITY_SCANNERS[patterns].findall(code))
+        folded_hits = {hit.lower() for hit in hits}
+        security_result['violations'] = [
+            f"Unsafe operation: {pattern}" for pattern in patterns
+            if (pattern in hits if pattern in _EXACT_CASE_PATTERNS else pattern.lower() in folded_hits)
         ]
         
-        if language == 'java':
-            dangerous_patterns.extend([
-                'Runtime.getRuntime', 'ProcessBuilder', 'System.exit',
-                'File(', 'FileWriter', 'FileReader'
-            ])
-        
-        for pattern in dangerous_patterns:
-            if pattern in code_lower:
-                security_result['violations'].append(f"Unsafe operation: {pattern}")
-        
         if security_result['violations']:
             security_result['is_safe'] = False
         
@@ -273,16 +639,4 @@ class CodeExecutionTool:
     
     def _extract_java_class_name(self, code: str) -> Optional[str]:
         """Extract public class name from Java code."""
-        import re
-        
-        # Look for public class declaration
-        match = re.search(r'public\s+class\s+(\w+)', code)
-        if match:
-            return match.group(1)
-        
-        # Look for any class declaration
-        match = re.search(r'class\s+(\w+)', code)
-        if match:
-            return match.group(1)
-        
-        return None
\ No newline at end of file
+        return _java_class_name(code)
@@ -6,11 +6,48 @@ Implements Google Search capabilities for the Researcher Agent to perform
 real-time lookups, validation, and industry standards research during interviews.
 """
 
+import asyncio
 import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import orjson
 import requests
-from typing import Dict, Any, List, Optional
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, List, Optional, Tuple
 import json
-from urllib.parse import quote_plus
+from urllib.parse import quote_plus, urlparse
+from urllib3.util.retry import Retry
+
+
+# Snippet categories (case-insensitive substrings; the lookahead keeps overlapping hits)
+_CONCEPT_CATEGORY_RE = re.compile(
+    r'(?=(?P<definition>definition|what is)|(?P<best_practice>best practice|how to)|(?P<example>example|tutorial))',
+    re.IGNORECASE
+)
+_MARKET_CATEGORY_RE = re.compile(
+    r'(?=(?P<salary>\$|salary)|(?P<trend>trend|growth|demand|increase)|(?P<skill>skill|requirement|technology))',
+    re.IGNORECASE
+)
+
+
+def _categories(pattern: re.Pattern, text: str) -> set:
+    """Return the names of the pattern's groups that occur in text, in one scan."""
+    return {match.lastgroup for match in pattern.finditer(text)}
+
+
+AUTHORITATIVE_DOMAINS = frozenset({
+    'stackoverflow.com', 'github.com', 'mozilla.org',
+    'w3.org', 'oracle.com', 'microsoft.com', 'google.com'
+})
+
+
+def _is_authoritative(url: str) -> bool:
+    """Check whether url is hosted on an authoritative domain or one of its subdomains."""
+    labels = (urlparse(url).hostname or '').split('.')
+    return any('.'.join(labels[i:]) in AUTHORITATIVE_DOMAINS for i in range(len(labels) - 1))
 
 
 class GoogleSearchTool:
@@ -22,8 +59,13 @@ class GoogleSearchTool:
     - Structured search results
     - Error handling and rate limiting
     - Support for targeted searches
+    - Keep-alive connection pooling to the Custom Search API
+    - In-memory TTL/LRU cache of recent queries (saves daily API quota)
     """
     
+    RESULT_CACHE_SIZE = 512
+    RESULT_CACHE_TTL_SECONDS = 60 * 60
+    
     def __init__(self):
         """Initialize Google Search tool with API configuration."""
         self.api_key = os.getenv("GOOGLE_SEARCH_API_KEY")
@@ -31,6 +73,24 @@ class GoogleSearchTool:
         self.base_url = "https://www.googleapis.com/customsearch/v1"
         self.max_results_per_request = 10
         
+        # One pooled session keeps the TLS connection to googleapis.com alive between
+        # queries; transient errors are retried, the final response is still raised on
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(
+                total=2,
+                backoff_factor=0.2,
+                status_forcelist=[429, 500, 502, 503, 504],
+                raise_on_status=False
+            )
+        ))
+        
+        # (query, num_results, search_type) -> (results, expires_at), least recently used first
+        self._result_cache: "OrderedDict[Tuple[str, int, str], Tuple[List[Dict[str, Any]], float]]" = OrderedDict()
+        self._result_cache_lock = threading.Lock()
+        
         if not self.api_key or not self.search_engine_id:
             print("⚠️ Google Search API credentials not configured. Search functionality will be limited.")
             self.api_configured = False
@@ -53,10 +113,14 @@ class GoogleSearchTool:
         if not self.api_configured:
             return self._mock_search_results(query, num_results)
         
+        # Limit results to API maximum
+        num_results = min(num_results, self.max_results_per_request)
+        cache_key = (query, num_results, search_type)
+        cached_results = self._get_cached_results(cache_key)
+        if cached_results is not None:
+            return cached_results
+        
         try:
-            # Limit results to API maximum
-            num_results = min(num_results, self.max_results_per_request)
-            
             # Prepare search parameters
             params = {
                 'key': self.api_key,
@@ -73,16 +137,15 @@ class GoogleSearchTool:
             
             # Make API request
             print(f"🔍 Searching for: {query}")
-            response = requests.get(self.base_url, params=params, timeout=10)
+            response = self._session.get(self.base_url, params=params, timeout=10)
             response.raise_for_status()
             
-            data = response.json()
+            data = orjson.loads(response.content)
             
             # Parse and structure results
             search_results = []
-            items = data.get('items', [])
             
-            for item in items:
+            for item in data.get('items', []):
                 result = {
                     'title': item.get('title', ''),
                     'url': item.get('link', ''),
@@ -92,25 +155,72 @@ class GoogleSearchTool:
                 }
                 
                 # Add additional metadata if available
-                if 'pagemap' in item:
-                    pagemap = item['pagemap']
-                    if 'metatags' in pagemap and pagemap['metatags']:
-                        metatag = pagemap['metatags'][0]
-                        result['description'] = metatag.get('og:description', result['snippet'])
-                        result['site_name'] = metatag.get('og:site_name', result['display_link'])
+                metatags = item.get('pagemap', {}).get('metatags')
+                if metatags:
+                    metatag = metatags[0]
+                    result['description'] = metatag.get('og:description', result['snippet'])
+                    result['site_name'] = metatag.get('og:site_name', result['display_link'])
                 
                 search_results.append(result)
             
             print(f"✅ Found {len(search_results)} results")
+            self._cache_results(cache_key, search_results)
             return search_results
             
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+            # An unparseable body is treated like a failed request, as response.json() did
             print(f"❌ Search API request failed: {e}")
             return self._mock_search_results(query, num_results)
         except Exception as e:
             print(f"❌ Search failed: {e}")
             return []
     
+    def clear_cache(self) -> None:
+        """Drop all cached search results."""
+        with self._result_cache_lock:
+            self._result_cache.clear()
+    
+    def _get_cached_results(self, cache_key: Tuple[str, int, str]) -> Optional[List[Dict[str, Any]]]:
+        """Return a copy of unexpired cached results for cache_key (None on a miss)."""
+        with self._result_cache_lock:
+            entry = self._result_cache.get(cache_key)
+            if entry is None:
+                return None
+            
+            results, expires_at = entry
+            if expires_at < time.time():
+                del self._result_cache[cache_key]
+                return None
+            self._result_cache.move_to_end(cache_key)
+        # Results are flat dicts of strings, so copying each dict protects the cache
+        return [dict(result) for result in results]
+    
+    def _cache_results(self, cache_key: Tuple[str, int, str], results: List[Dict[str, Any]]) -> None:
+        """Cache a copy of successful API results, evicting the least recently used entries."""
+        entry = ([dict(result) for result in results], time.time() + self.RESULT_CACHE_TTL_SECONDS)
+        with self._result_cache_lock:
+            self._result_cache[cache_key] = entry
+            self._result_cache.move_to_end(cache_key)
+            while len(self._result_cache) > self.RESULT_CACHE_SIZE:
+                self._result_cache.popitem(last=False)
+    
+    async def search_async(self, query: str, num_results: int = 5, search_type: str = "web") -> List[Dict[str, Any]]:
+        """
+        Perform a Google search without blocking the event loop.
+        
+        The request runs on a worker thread over the pooled session, so agents can
+        fan out with asyncio.gather(*(tool.search_async(q) for q in queries)).
+        
+        Args:
+            query: Search query string
+            num_results: Number of results to return (max 10 per request)
+            search_type: Type of search ('web', 'image', 'news')
+            
+        Returns:
+            List of search result dictionaries
+        """
+        return await asyncio.to_thread(self.search, query, num_results, search_type)
+    
     def search_technical_concept(self, concept: str, context: str = "") -> Dict[str, Any]:
         """
         Search for technical concept with structured analysis.
@@ -138,27 +248,24 @@ class GoogleSearchTool:
             'authoritative_sources': []
         }
         
-        for query in queries:
-            results = self.search(query, num_results=3)
-            
+        for results in self._search_all(queries, num_results=3):
             for result in results:
                 # Categorize results based on content
-                snippet = result['snippet'].lower()
-                title = result['title'].lower()
+                categories = _categories(_CONCEPT_CATEGORY_RE, result['snippet'])
                 
-                if 'definition' in snippet or 'what is' in snippet:
+                if 'definition' in categories:
                     concept_info['definitions'].append({
                         'source': result['display_link'],
                         'definition': result['snippet'],
                         'url': result['url']
                     })
-                elif 'best practice' in snippet or 'how to' in snippet:
+                elif 'best_practice' in categories:
                     concept_info['best_practices'].append({
                         'source': result['display_link'],
                         'practice': result['snippet'],
                         'url': result['url']
                     })
-                elif 'example' in snippet or 'tutorial' in snippet:
+                elif 'example' in categories:
                     concept_info['examples'].append({
                         'source': result['display_link'],
                         'example': result['snippet'],
@@ -166,12 +273,7 @@ class GoogleSearchTool:
                     })
                 
                 # Identify authoritative sources
-                authoritative_domains = [
-                    'stackoverflow.com', 'github.com', 'mozilla.org',
-                    'w3.org', 'oracle.com', 'microsoft.com', 'google.com'
-                ]
-                
-                if any(domain in result['url'] for domain in authoritative_domains):
+                if _is_authoritative(result['url']):
                     concept_info['authoritative_sources'].append(result)
         
         return concept_info
@@ -205,14 +307,13 @@ class GoogleSearchTool:
             'sources': []
         }
         
-        for query in queries:
-            results = self.search(query, num_results=3)
-            
+        for results in self._search_all(queries, num_results=3):
             for result in results:
                 snippet = result['snippet']
+                categories = _categories(_MARKET_CATEGORY_RE, snippet)
                 
                 # Look for salary information
-                if '$' in snippet or 'salary' in snippet.lower():
+                if 'salary' in categories:
                     market_info['salary_ranges'].append({
                         'source': result['display_link'],
                         'info': snippet,
@@ -220,7 +321,7 @@ class GoogleSearchTool:
                     })
                 
                 # Look for trend information
-                if any(word in snippet.lower() for word in ['trend', 'growth', 'demand', 'increase']):
+                if 'trend' in categories:
                     market_info['market_trends'].append({
                         'source': result['display_link'],
                         'trend': snippet,
@@ -228,7 +329,7 @@ class GoogleSearchTool:
                     })
                 
                 # Look for skill information
-                if any(word in snippet.lower() for word in ['skill', 'requirement', 'technology']):
+                if 'skill' in categories:
                     market_info['skill_demands'].append({
                         'source': result['display_link'],
                         'skills': snippet,
@@ -239,6 +340,20 @@ class GoogleSearchTool:
         
         return market_info
     
+    def _search_all(self, queries: List[str], num_results: int) -> List[List[Dict[str, Any]]]:
+        """
+        Run independent searches concurrently.
+        
+        Args:
+            queries: Search query strings
+            num_results: Number of results to return per query
+            
+        Returns:
+            Result list of each query, in query order
+        """
+        with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+            return list(executor.map(lambda query: self.search(query, num_results=num_results), queries))
+    
     def _mock_search_results(self, query: str, num_results: int) -> List[Dict[str, Any]]:
         """
         Return mock search results when API is not configured.
@@ -0,0 +1,197 @@
+"""
+Python Worker
+Author: Amin Motiwala
+
+Long-lived interpreter used by the CodeExecutionTool worker pool. Each task is read
+from the worker's protocol pipe and run as __main__ in a child forked from this
+already-started interpreter, then answered with its stdout, stderr and exit code, so
+snippets skip interpreter startup. The worker itself never runs submitted code: every
+program starts from the same clean state, and whatever it changes (builtins, modules,
+recursion limit, threads left running) dies with its child.
+"""
+
+import builtins
+import io
+import math
+import os
+import pickle
+import resource
+import select
+import signal
+import struct
+import sys
+import tempfile
+import threading
+import traceback
+from typing import Any, BinaryIO, Optional, Sequence, Tuple, Union
+
+
+# Frames on the protocol pipe are a 4-byte big-endian length followed by a pickle
+FRAME_HEADER = struct.Struct('!I')
+
+# Per-program limits, applied in each child before it runs. Memory matches
+# ATICSettings.CODE_EXECUTION_MAX_MEMORY_MB; the file size limit caps the captured
+# stdout/stderr (and any file the program writes) on disk
+MAX_MEMORY_BYTES = 128 * 1024 * 1024
+MAX_OUTPUT_BYTES = 16 * 1024 * 1024
+
+
+def read_frame(stream: BinaryIO) -> Optional[Any]:
+    """Read one frame from stream (None once the other end has closed it)."""
+    header = stream.read(FRAME_HEADER.size)
+    if len(header) < FRAME_HEADER.size:
+        return None
+    (size,) = FRAME_HEADER.unpack(header)
+    return pickle.loads(stream.read(size))
+
+
+def write_frame(stream: BinaryIO, value: Any) -> None:
+    """Write value to stream as one frame."""
+    payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    stream.write(FRAME_HEADER.pack(len(payload)) + payload)
+    stream.flush()
+
+
+def _exit_code(code: Any, stderr: io.TextIOBase) -> int:
+    """Map a SystemExit code to a process exit status, as the interpreter does."""
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=stderr)
+    return 1
+
+
+def apply_limits(timeout_seconds: float) -> None:
+    """
+    Limit the calling process's address space, CPU time and file size.
+
+    The CPU limit backs up the worker's wall-clock timeout: a busy program gets SIGXCPU
+    a second after it, then SIGKILL. Writes past MAX_OUTPUT_BYTES fail with EFBIG.
+    """
+    cpu_seconds = math.ceil(timeout_seconds) + 1
+    resource.setrlimit(resource.RLIMIT_AS, (MAX_MEMORY_BYTES, MAX_MEMORY_BYTES))
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (MAX_OUTPUT_BYTES, MAX_OUTPUT_BYTES))
+
+
+def run_task(code: str, cwd: str, source_file: str) -> int:
+    """
+    Run code as if it were `python source_file` started in cwd.
+
+    Called in a forked child whose file descriptors 0-2 already point at the task's
+    stdin, stdout and stderr files.
+
+    Args:
+        code: Source code to execute
+        cwd: Working directory (and first sys.path entry) of the program
+        source_file: Path the code was written to, used for __file__ and tracebacks
+
+    Returns:
+        int: Exit status of the program
+    """
+    os.chdir(cwd)
+    sys.path[0] = cwd
+    sys.argv = [source_file]
+    # Fresh UTF-8 text streams over the real descriptors, as for `python file.py` on
+    # pipes: .buffer and fileno() work and stdin gets universal newlines
+    sys.stdin = open(0, 'r', encoding='utf-8', closefd=False)
+    sys.stdout = open(1, 'w', encoding='utf-8', closefd=False)
+    sys.stderr = open(2, 'w', encoding='utf-8', errors='backslashreplace', buffering=1, closefd=False)
+    return_code = 0
+
+    try:
+        exec(compile(code, source_file, 'exec'),
+             {'__name__': '__main__', '__file__': source_file, '__builtins__': builtins})
+    except SystemExit as e:
+        return_code = _exit_code(e.code, sys.stderr)
+    except BaseException as e:
+        # Drop this frame so the traceback starts in the program, as with `python file.py`
+        traceback.print_exception(type(e), e, e.__traceback__.tb_next, file=sys.stderr)
+        return_code = 1
+
+    # The interpreter waits for non-daemon threads before exiting; so does the child
+    for thread in threading.enumerate():
+        if thread is not threading.current_thread() and not thread.daemon:
+            thread.join()
+    for stream in (sys.stdout, sys.stderr):
+        try:
+            stream.flush()
+        except (ValueError, OSError):
+            pass
+    return return_code
+
+
+def serve_task(code: str, stdin_bytes: bytes, cwd: str, source_file: str, timeout_seconds: float,
+               protocol_fds: Sequence[int]) -> Tuple[bytes, bytes, int, bool]:
+    """
+    Run one task in a forked child and collect its output.
+
+    Args:
+        code: Source code to execute
+        stdin_bytes: UTF-8 bytes served to the program on stdin
+        cwd: Working directory of the program
+        source_file: Path the code was written to
+        timeout_seconds: Wall-clock limit; the child is killed when it is exceeded
+        protocol_fds: Worker protocol descriptors the child must not inherit
+
+    Returns:
+        Tuple of (stdout bytes, stderr bytes, return_code, timed_out)
+    """
+    with tempfile.TemporaryFile() as stdin_file, tempfile.TemporaryFile() as stdout_file, \
+            tempfile.TemporaryFile() as stderr_file:
+        stdin_file.write(stdin_bytes)
+        stdin_file.flush()
+        stdin_file.seek(0)
+        # The child holds the write end; it reads as EOF once the child (and anything
+        # it started) has exited
+        done_read, done_write = os.pipe()
+
+        pid = os.fork()
+        if pid == 0:
+            return_code = 1
+            try:
+                os.setpgid(0, 0)
+                os.close(done_read)
+                for fd in protocol_fds:
+                    os.close(fd)
+                for fd, task_file in ((0, stdin_file), (1, stdout_file), (2, stderr_file)):
+                    os.dup2(task_file.fileno(), fd)
+                apply_limits(timeout_seconds)
+                return_code = run_task(code, cwd, source_file)
+            finally:
+                os._exit(return_code & 0xFF)
+
+        os.close(done_write)
+        ready, _, _ = select.select([done_read], [], [], timeout_seconds)
+        timed_out = not ready
+        if timed_out:
+            try:
+                os.killpg(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        _, status = os.waitpid(pid, 0)
+        os.close(done_read)
+
+        stdout_file.seek(0)
+        stderr_file.seek(0)
+        return stdout_file.read(), stderr_file.read(), os.waitstatus_to_exitcode(status), timed_out
+
+
+def main() -> None:
+    """Serve tasks until the pool closes the protocol pipe."""
+    # Keep the protocol on private descriptors; programs writing to the real
+    # stdin/stdout file descriptors cannot corrupt the frame stream
+    protocol_in = os.fdopen(os.dup(0), 'rb')
+    protocol_out = os.fdopen(os.dup(1), 'wb')
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    protocol_fds = (protocol_in.fileno(), protocol_out.fileno(), devnull)
+
+    while (task := read_frame(protocol_in)) is not None:
+        write_frame(protocol_out, serve_task(*task, protocol_fds=protocol_fds))
+
+
+if __name__ == '__main__':
+    main()